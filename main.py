@@ -1,22 +1,212 @@
 # main.py
 
+import re
 import sys
+import threading
+import time
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QLabel, QLineEdit, QPushButton,
-    QTextEdit, QVBoxLayout, QHBoxLayout, QGroupBox, QMessageBox
+    QApplication, QWidget, QLabel, QLineEdit, QPushButton, QTextEdit, QVBoxLayout,
+    QHBoxLayout, QGroupBox, QMessageBox, QProgressBar, QComboBox, QTableView, QHeaderView
 )
-from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtCore import Qt, QObject, QThread, QAbstractTableModel, QModelIndex, pyqtSignal, pyqtSlot
 
-from modules.regex_parser import RegexParser
-from modules.nfa_builder import NFABuilder
-from modules.dfa_builder import DFABuilder
-from modules.dfa_minimizer import DFAMinimizer
+from modules.compiler import compile as compile_pattern
+from modules.incremental import IncrementalCompiler
+from modules.budget import CompileBudget, CompileCancelled
+from modules.regex_parser import postfix_text
 from modules.visualizer import Visualizer
 from modules.simulator import Simulator
 
+MAX_DRAWN_STATES = 60  # larger automata are listed but not drawn
+PROGRESS_INTERVAL = 0.1  # seconds between progress updates sent by the worker
+
+
+def natural_key(value):
+    """Sort key that puts D2 before D10"""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", str(value))]
+
+
+class TransitionTableModel(QAbstractTableModel):
+    """
+    Read-only table model over a transition mapping {state: {symbol: dest(s)}},
+    one row per state and one column per symbol.
+    Cells are looked up and formatted only when the view asks for them,
+    i.e. for the rows on screen, so a DFA with 100k states opens and
+    scrolls like a small one. The model keeps the row order (a list of
+    state keys) but never a copy of the transitions. Sorting and filtering
+    just reorder or shorten that list.
+    """
+
+    START_COLOR = QColor("#7CFC00")  # same colors as the Visualizer
+    FINAL_COLOR = QColor("#87CEEB")
+
+    def __init__(self, transitions, start_state, final_states, parent=None):
+        """
+        Parameters:
+        - transitions: mapping {state: {symbol: next_state or [next_states]}}
+        - start_state: start state
+        - final_states: collection of final states
+        """
+        super().__init__(parent)
+        self.transitions = transitions
+        self.start_state = start_state
+        self.final_states = final_states if isinstance(final_states, (set, frozenset)) else set(final_states)
+        self.states = list(transitions)
+        symbols = set()
+        for paths in transitions.values():
+            symbols.update(paths)
+        self.symbols = sorted(symbols, key=lambda symbol: (symbol == 'ε', symbol))  # ε last
+        self.rows = self.states
+        self.columns = self.symbols
+        self.sort_column = -1  # -1: construction order
+        self.sort_order = Qt.AscendingOrder
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns) + 1
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Vertical:
+            return section + 1
+        return "State" if section == 0 else self.columns[section - 1]
+
+    def state_label(self, state):
+        marks = ("→" if state == self.start_state else "") + ("*" if state in self.final_states else "")
+        return f"{marks}{state}"
+
+    def cell(self, state, symbol):
+        dest = self.transitions[state].get(symbol)
+        if dest is None:
+            return ""
+        if isinstance(dest, list):
+            return "{" + ", ".join(map(str, dest)) + "}"
+        return str(dest)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        state = self.rows[index.row()]
+        if index.column() == 0:
+            if role == Qt.DisplayRole:
+                return self.state_label(state)
+            if role == Qt.BackgroundRole:
+                if state == self.start_state:
+                    return self.START_COLOR
+                if state in self.final_states:
+                    return self.FINAL_COLOR
+            return None
+        if role == Qt.DisplayRole:
+            return self.cell(state, self.columns[index.column() - 1])
+        return None
+
+    def sort_rows(self, rows):
+        if self.sort_column < 0:
+            return rows
+        if self.sort_column == 0:
+            key = natural_key
+        else:
+            symbol = self.columns[self.sort_column - 1]
+            key = lambda state: natural_key(self.cell(state, symbol))
+        return sorted(rows, key=key, reverse=self.sort_order == Qt.DescendingOrder)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_states = [self.rows[index.row()] for index in old_indexes]
+        self.sort_column = column
+        self.sort_order = order
+        self.rows = self.sort_rows(self.rows)
+        if old_indexes:
+            position = {state: row for row, state in enumerate(self.rows)}
+            self.changePersistentIndexList(old_indexes, [self.index(position[state], index.column())
+                                                         for state, index in zip(old_states, old_indexes)])
+        self.layoutChanged.emit()
+
+    def set_filter(self, state_text="", symbol_text=""):
+        """
+        Show only states whose name contains state_text and, if symbol_text
+        names any symbols, only those symbol columns and the states with a
+        transition on one of them.
+        """
+        self.beginResetModel()
+        wanted = set(symbol_text) - set(" ,")
+        self.columns = [symbol for symbol in self.symbols if symbol in wanted] if wanted else self.symbols
+        if self.sort_column > len(self.columns):
+            self.sort_column = -1
+        rows = self.states
+        if state_text:
+            rows = [state for state in rows if state_text in str(state)]
+        if wanted:
+            transitions = self.transitions
+            rows = [state for state in rows if any(symbol in transitions[state] for symbol in self.columns)]
+        self.rows = self.sort_rows(rows)
+        self.endResetModel()
+
+
+class CompileWorker(QObject):
+    """
+    Runs the construction stages on a background QThread, so the window
+    stays responsive while large automata build.
+    Stages form a pipeline on one lazily built, cached CompiledPattern:
+    "nfa" parses the regex and builds only the NFA, "dfa" and "min_dfa"
+    build their own stage on top, so each button pays only for its stage.
+    A regex built before comes back from the pattern cache with its stages,
+    and the minimized DFA of an edited regex is assembled from memoized
+    sub-expression DFAs.
+    Progress and results come back to the GUI thread as signals; a build is
+    cancelled by setting cancel_event, which the construction loops poll.
+    """
+    progress = pyqtSignal(str, int)  # stage name, states (or blocks) so far
+    finished = pyqtSignal(str, object)  # requested stage, its result
+    failed = pyqtSignal(str, str)  # requested stage, error message
+    cancelled = pyqtSignal(str)  # requested stage
+
+    def __init__(self):
+        super().__init__()
+        self.cancel_event = threading.Event()
+        self.budget = CompileBudget(progress=self.report, cancel=self.cancel_event)
+        # Sub-expression DFAs shared across rebuilds, so an edited regex only
+        # recompiles the changed part
+        self.incremental = IncrementalCompiler()
+        self.pattern = None
+        self.last_report = 0.0
+
+    def report(self, stage, count):
+        """Budget progress hook: called for every state, forwards a few updates per second"""
+        now = time.monotonic()
+        if now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            self.progress.emit(stage, count)
+
+    @pyqtSlot(str, str)
+    def run(self, stage, regex):
+        try:
+            if stage == "nfa":
+                self.pattern = compile_pattern(regex, budget=self.budget, fallback=None,
+                                               incremental=self.incremental, lazy=True)
+                result = (self.pattern.postfix, self.pattern.nfa)
+            elif stage == "dfa":
+                result = self.pattern.dfa
+            else:
+                min_dfa = self.pattern.min_dfa
+                result = (min_dfa, Simulator(*min_dfa))
+        except CompileCancelled:
+            self.cancelled.emit(stage)
+        except Exception as e:
+            self.failed.emit(stage, str(e))
+        else:
+            self.finished.emit(stage, result)
+
 
 class TOAGUI(QWidget):
+    run_stage = pyqtSignal(str, str)  # stage, regex; handled by the worker thread
+    STAGE_NAMES = {"nfa": "NFA", "dfa": "DFA", "min_dfa": "Minimized DFA"}
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Theory of Automata Project")
@@ -85,6 +275,54 @@ class TOAGUI(QWidget):
         buttons_layout.addWidget(self.build_min_dfa_button)
         buttons_group.setLayout(buttons_layout)
 
+        self.status_label = QLabel("Ready")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)  # (0, 0) while busy: indeterminate
+        self.progress_bar.setTextVisible(False)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFont(button_font)
+        self.cancel_button.setToolTip("Stop the construction in progress")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_build)
+
+        progress_group = QGroupBox("Progress")
+        progress_layout = QHBoxLayout()
+        progress_layout.addWidget(self.status_label, 2)
+        progress_layout.addWidget(self.progress_bar, 3)
+        progress_layout.addWidget(self.cancel_button)
+        progress_group.setLayout(progress_layout)
+
+        # -------------------------
+        # Transition tables
+        # -------------------------
+        self.table_models = {}  # {table name: TransitionTableModel}
+        self.table_selector = QComboBox()
+        self.table_selector.currentTextChanged.connect(self.show_table)
+        self.state_filter = QLineEdit()
+        self.state_filter.setPlaceholderText("Filter states")
+        self.state_filter.textChanged.connect(self.apply_table_filter)
+        self.symbol_filter = QLineEdit()
+        self.symbol_filter.setPlaceholderText("Filter symbols, e.g. a,b")
+        self.symbol_filter.textChanged.connect(self.apply_table_filter)
+
+        self.table_view = QTableView()
+        self.table_view.setFont(QFont("Courier New", 10))
+        # Fixed row heights: the view never measures rows that are off screen
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table_view.verticalHeader().setDefaultSectionSize(22)
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+
+        table_group = QGroupBox("Transition Tables")
+        table_layout = QVBoxLayout()
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(self.table_selector)
+        filter_layout.addWidget(self.state_filter)
+        filter_layout.addWidget(self.symbol_filter)
+        table_layout.addLayout(filter_layout)
+        table_layout.addWidget(self.table_view)
+        table_group.setLayout(table_layout)
+
         simulate_group = QGroupBox("String Simulation")
         simulate_layout = QVBoxLayout()
         simulate_layout.addWidget(self.string_label)
@@ -108,7 +346,9 @@ class TOAGUI(QWidget):
         main_layout.setSpacing(15)
         main_layout.addWidget(regex_group)
         main_layout.addWidget(buttons_group)
+        main_layout.addWidget(progress_group)
         main_layout.addWidget(simulate_group)
+        main_layout.addWidget(table_group, 2)
         main_layout.addWidget(QLabel("Output:"))
         main_layout.addWidget(self.output_display)
         self.setLayout(main_layout)
@@ -123,43 +363,138 @@ class TOAGUI(QWidget):
         self.min_dfa_transitions = None
         self.min_dfa_start = None
         self.min_dfa_finals = None
+        self.min_dfa_simulator = None
+
+        # -------------------------
+        # Background construction
+        # -------------------------
+        self.worker_thread = QThread(self)
+        self.worker = CompileWorker()
+        self.worker.moveToThread(self.worker_thread)
+        self.run_stage.connect(self.worker.run)
+        self.worker.progress.connect(self.show_progress)
+        self.worker.finished.connect(self.stage_finished)
+        self.worker.failed.connect(self.stage_failed)
+        self.worker.cancelled.connect(self.stage_cancelled)
+        self.worker_thread.start()
 
     # -------------------------
-    # Helper function to display transition tables in GUI
+    # Transition tables in the GUI
     # -------------------------
-    def display_transition_table(self, transitions, name):
-        table_str = f"=== {name} ===\n"
-        for state, trans in transitions.items():
-            table_str += f"{state}: {trans}\n"
-        table_str += "=" * 30 + "\n"
-        self.output_display.append(f"<pre>{table_str}</pre>")
+    def display_transition_table(self, transitions, name, start_state, final_states):
+        self.discard_table_model(name)
+        model = TransitionTableModel(transitions, start_state, final_states, self)
+        self.table_models[name] = model
+        if self.table_selector.findText(name) < 0:
+            self.table_selector.addItem(name)
+        if self.table_selector.currentText() == name:
+            self.show_table(name)
+        else:
+            self.table_selector.setCurrentText(name)  # shows it through currentTextChanged
+        self.output_display.append(f"{name}: {len(transitions)} states, {len(model.symbols)} symbols")
+
+    def remove_transition_tables(self, names):
+        for name in names:
+            self.discard_table_model(name)
+            index = self.table_selector.findText(name)
+            if index >= 0:
+                self.table_selector.removeItem(index)
+
+    def discard_table_model(self, name):
+        """Detach and delete a table's model; as a child of the window it would live as long as the window"""
+        model = self.table_models.pop(name, None)
+        if model is None:
+            return
+        if self.table_view.model() is model:
+            self.table_view.setModel(None)
+        model.deleteLater()
+
+    def show_table(self, name):
+        model = self.table_models.get(name)
+        if model is None:
+            return
+        model.set_filter(self.state_filter.text(), self.symbol_filter.text())
+        self.table_view.setModel(model)
+
+    def apply_table_filter(self):
+        model = self.table_view.model()
+        if model is not None:
+            model.set_filter(self.state_filter.text(), self.symbol_filter.text())
+
+    def closeEvent(self, event):
+        self.worker.cancel_event.set()
+        self.worker_thread.quit()
+        self.worker_thread.wait()
+        super().closeEvent(event)
+
+    # -------------------------
+    # Running stages on the worker
+    # -------------------------
+    def start_stage(self, stage, regex=""):
+        self.worker.cancel_event.clear()
+        self.set_busy(True)
+        self.status_label.setText(f"Building {self.STAGE_NAMES[stage]}...")
+        self.run_stage.emit(stage, regex)
+
+    def set_busy(self, busy):
+        for button in (self.build_nfa_button, self.build_dfa_button,
+                       self.build_min_dfa_button, self.simulate_button):
+            button.setEnabled(not busy)
+        self.cancel_button.setEnabled(busy)
+        self.progress_bar.setRange(0, 0 if busy else 1)
+
+    def show_progress(self, stage, count):
+        unit = "blocks" if stage == "minimization" else "states"
+        self.status_label.setText(f"{stage.capitalize()}: {count:,} {unit}")
+
+    def cancel_build(self):
+        self.worker.cancel_event.set()
+        self.status_label.setText("Cancelling...")
+
+    def stage_finished(self, stage, result):
+        self.set_busy(False)
+        self.status_label.setText(f"{self.STAGE_NAMES[stage]} ready")
+        if stage == "nfa":
+            self.show_nfa(*result)
+        elif stage == "dfa":
+            self.show_dfa(*result)
+        else:
+            self.show_min_dfa(*result)
+
+    def stage_failed(self, stage, message):
+        self.set_busy(False)
+        self.status_label.setText(f"{self.STAGE_NAMES[stage]} failed")
+        QMessageBox.warning(self, "Error", message)
+
+    def stage_cancelled(self, stage):
+        # Stages built before this one are kept; running it again starts from them
+        self.set_busy(False)
+        self.status_label.setText(f"{self.STAGE_NAMES[stage]} cancelled")
+        self.output_display.append(f"{self.STAGE_NAMES[stage]} construction cancelled.\n")
+
+    def draw(self, transitions, start_state, final_states, title):
+        if len(transitions) > MAX_DRAWN_STATES:
+            self.output_display.append(f"{title} not drawn: {len(transitions)} states.\n")
+            return
+        # Non-blocking: the figure window lives beside the Qt event loop
+        Visualizer(transitions=transitions, start_state=start_state,
+                   final_states=final_states, title=title).draw(block=False)
 
     # -------------------------
     # Build NFA
     # -------------------------
     def build_nfa(self):
-        regex = self.regex_input.text()
-        try:
-            parser = RegexParser(regex)
-            parser.validate()
-            parser.add_concatenation()
-            postfix = parser.to_postfix()
-            self.output_display.append(f"<b>Postfix Expression:</b> {postfix}\n")
-
-            nfa_builder = NFABuilder()
-            self.nfa = nfa_builder.build_from_postfix(postfix)
-            self.display_transition_table(self.nfa.transitions, "NFA Table")
-            self.output_display.append("NFA built successfully.\n")
-
-            Visualizer(
-                transitions=self.nfa.transitions,
-                start_state=self.nfa.start_state,
-                final_states=[self.nfa.final_state],
-                title="NFA Diagram"
-            ).draw()
-
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+        self.start_stage("nfa", self.regex_input.text())
+
+    def show_nfa(self, postfix, nfa):
+        # A new regex: stages shown for the previous one no longer apply
+        self.nfa = nfa
+        self.dfa_transitions = self.min_dfa_transitions = None
+        self.remove_transition_tables(["DFA Table", "Minimized DFA Table"])
+        self.output_display.append(f"<b>Postfix Expression:</b> {postfix_text(postfix)}\n")
+        self.display_transition_table(nfa.transitions, "NFA Table", nfa.start_state, [nfa.final_state])
+        self.output_display.append("NFA built successfully.\n")
+        self.draw(nfa.transitions, nfa.start_state, [nfa.final_state], "NFA Diagram")
 
     # -------------------------
     # Build DFA
@@ -168,21 +503,13 @@ class TOAGUI(QWidget):
         if not self.nfa:
             QMessageBox.warning(self, "Error", "Build NFA first!")
             return
-        try:
-            dfa_builder = DFABuilder(self.nfa.transitions, self.nfa.start_state, self.nfa.final_state)
-            self.dfa_transitions, self.dfa_start, self.dfa_finals = dfa_builder.build_dfa()
-            self.display_transition_table(self.dfa_transitions, "DFA Table")
-            self.output_display.append("DFA built successfully.\n")
-
-            Visualizer(
-                transitions=self.dfa_transitions,
-                start_state=self.dfa_start,
-                final_states=self.dfa_finals,
-                title="DFA Diagram"
-            ).draw()
+        self.start_stage("dfa")
 
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+    def show_dfa(self, transitions, start_state, final_states):
+        self.dfa_transitions, self.dfa_start, self.dfa_finals = transitions, start_state, final_states
+        self.display_transition_table(self.dfa_transitions, "DFA Table", self.dfa_start, self.dfa_finals)
+        self.output_display.append("DFA built successfully.\n")
+        self.draw(self.dfa_transitions, self.dfa_start, self.dfa_finals, "DFA Diagram")
 
     # -------------------------
     # Build Minimized DFA
@@ -191,21 +518,15 @@ class TOAGUI(QWidget):
         if not self.dfa_transitions:
             QMessageBox.warning(self, "Error", "Build DFA first!")
             return
-        try:
-            minimizer = DFAMinimizer(self.dfa_transitions, self.dfa_start, self.dfa_finals)
-            self.min_dfa_transitions, self.min_dfa_start, self.min_dfa_finals = minimizer.minimize()
-            self.display_transition_table(self.min_dfa_transitions, "Minimized DFA Table")
-            self.output_display.append("DFA Minimization completed.\n")
-
-            Visualizer(
-                transitions=self.min_dfa_transitions,
-                start_state=self.min_dfa_start,
-                final_states=self.min_dfa_finals,
-                title="Minimized DFA Diagram"
-            ).draw()
+        self.start_stage("min_dfa")
 
-        except Exception as e:
-            QMessageBox.warning(self, "Error", str(e))
+    def show_min_dfa(self, min_dfa, simulator):
+        self.min_dfa_transitions, self.min_dfa_start, self.min_dfa_finals = min_dfa
+        self.min_dfa_simulator = simulator
+        self.display_transition_table(self.min_dfa_transitions, "Minimized DFA Table",
+                                      self.min_dfa_start, self.min_dfa_finals)
+        self.output_display.append("DFA Minimization completed.\n")
+        self.draw(self.min_dfa_transitions, self.min_dfa_start, self.min_dfa_finals, "Minimized DFA Diagram")
 
     # -------------------------
     # Simulate string (with colors)
@@ -216,27 +537,29 @@ class TOAGUI(QWidget):
             QMessageBox.warning(self, "Error", "Please build the automata first!")
             return
 
-        simulator = Simulator(self.min_dfa_transitions, self.min_dfa_start, self.min_dfa_finals)
         try:
-            steps, accepted = simulator.simulate(input_string)
-            self.output_display.append('<b>String Simulation Steps:</b>')
+            trace = self.min_dfa_simulator.trace(input_string)
+            accepted = trace.accepted
+            last_index = len(trace) - 1
+            lines = ['<b>String Simulation Steps:</b>']
 
-            for current, symbol, next_state in steps:
+            for index, (current, symbol, next_state) in enumerate(trace):
                 if next_state is None:
                     # Invalid transition - red
-                    self.output_display.append(
+                    lines.append(
                         f'<span style="color:red;">{current} --{symbol}--> None (Invalid transition)</span>'
                     )
-                elif next_state in self.min_dfa_finals and len(steps) == steps.index((current, symbol, next_state)) + 1:
+                elif next_state in self.min_dfa_finals and index == last_index:
                     # Last step ends in final state - green
-                    self.output_display.append(
+                    lines.append(
                         f'<span style="color:green;">{current} --{symbol}--> {next_state}</span>'
                     )
                 else:
                     # Normal transition - blue
-                    self.output_display.append(
+                    lines.append(
                         f'<span style="color:blue;">{current} --{symbol}--> {next_state}</span>'
                     )
+            self.output_display.append("<br>".join(lines))
 
             # Final result
             result_color = "green" if accepted else "red"
@@ -0,0 +1,184 @@
+# modules/aho_corasick.py
+
+from array import array
+
+from modules.regex_parser import postfix_to_tree
+from modules.compiled_dfa import CompiledDFA, DEAD
+
+
+def literal_alternatives(postfix):
+    """
+    If the postfix regex is a pure union of literals (like ed+ee+f), return
+    the literals; otherwise return None.
+    """
+    keywords = []
+    branches = [postfix_to_tree(postfix)]
+    while branches:
+        node = branches.pop()
+        if node[0] == 'alt':
+            branches.append(node[2])
+            branches.append(node[1])
+            continue
+        # A branch must be a concatenation of plain symbols
+        chars = []
+        stack = [node]
+        while stack:
+            part = stack.pop()
+            if part[0] == 'sym':
+                chars.append(part[1])
+            elif part[0] == 'cat':
+                stack.append(part[2])
+                stack.append(part[1])
+            else:
+                return None
+        keywords.append("".join(chars))
+    return keywords
+
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton for a set of keywords, built without going through
+    Thompson construction, subset construction or minimization.
+
+    Two CompiledDFA tables are produced:
+    - trie: anchored automaton accepting exactly the keywords (for accepts)
+    - automaton: failure links folded into a complete transition table, so
+      unanchored search reads every input symbol once
+    """
+
+    def __init__(self, keywords):
+        """
+        Build the automaton.
+
+        Parameters:
+        - keywords: list of non-empty literal strings
+        """
+        self.keywords = list(keywords)
+        symbols = sorted({c for keyword in self.keywords for c in keyword})
+        symbol_map = {c: i for i, c in enumerate(symbols)}
+        n_symbols = len(symbols)
+
+        # Trie: goto[state] = {column: child}; ends[state] = keyword indices ending here
+        goto = [{}]
+        ends = [[]]
+        for index, keyword in enumerate(self.keywords):
+            if not keyword:
+                raise ValueError("Error: Empty keyword")
+            state = 0
+            for c in keyword:
+                column = symbol_map[c]
+                child = goto[state].get(column)
+                if child is None:
+                    child = len(goto)
+                    goto[state][column] = child
+                    goto.append({})
+                    ends.append([])
+                state = child
+            ends[state].append(index)
+        n_states = len(goto)
+
+        trie = array('i', [DEAD]) * (n_states * n_symbols)
+        for state, children in enumerate(goto):
+            for column, child in children.items():
+                trie[state * n_symbols + column] = child
+        accepting = bytearray(1 if keyword_ends else 0 for keyword_ends in ends)
+        self.trie = CompiledDFA(trie, n_symbols, symbol_map, 0, accepting)
+
+        # Breadth-first: a state's failure target is shallower, so its row is
+        # complete by the time the state's own row is copied from it
+        table = array('i', [0]) * (n_states * n_symbols)
+        outputs = [()] * n_states
+        fail = [0] * n_states
+        queue = []
+        for column, child in goto[0].items():
+            table[column] = child
+            queue.append(child)
+        for state in queue:
+            base = state * n_symbols
+            f = fail[state]
+            table[base:base + n_symbols] = table[f * n_symbols:(f + 1) * n_symbols]
+            outputs[state] = tuple(sorted(
+                {len(self.keywords[i]) for i in ends[state]} | set(outputs[f]), reverse=True))
+            for column, child in goto[state].items():
+                fail[child] = table[f * n_symbols + column]
+                table[base + column] = child
+                queue.append(child)
+        self.outputs = outputs  # keyword lengths ending at each state, longest first
+        self.max_length = max(map(len, self.keywords))
+        search_accepting = bytearray(1 if out else 0 for out in outputs)
+        self.automaton = CompiledDFA(table, n_symbols, symbol_map, 0, search_accepting)
+
+    def accepts(self, input_string):
+        """Return True if input_string is exactly one of the keywords"""
+        return self.trie.accepts(input_string)
+
+    def finditer(self, text, pos=0):
+        """
+        Yield (start, end) of successive non-overlapping leftmost-longest
+        keyword occurrences in text[pos:], reading each symbol once.
+        """
+        automaton = self.automaton
+        table = automaton.table
+        n_symbols = automaton.n_symbols
+        outputs = self.outputs
+        max_length = self.max_length
+        if isinstance(text, str):
+            columns = automaton.symbol_map.get
+        else:
+            columns = {b: c for b, c in enumerate(automaton.byte_map) if c != DEAD}.get
+
+        pending = {}  # {start: longest end seen so far}, starts within max_length
+        floor = pos  # end of the last reported match
+        state = 0
+        n = len(text)
+        for j in range(pos, n):
+            column = columns(text[j], DEAD)
+            state = 0 if column < 0 else table[state * n_symbols + column]
+            end = j + 1
+            for length in outputs[state]:
+                start = end - length
+                if start >= floor and pending.get(start, -1) < end:
+                    pending[start] = end
+            # Starts older than this cannot grow any longer: report them in order
+            limit = end + 1 - max_length
+            while pending:
+                start = min(pending)
+                if start >= limit:
+                    break
+                match_end = pending.pop(start)
+                if start >= floor:
+                    yield start, match_end
+                    floor = match_end
+        for start in sorted(pending):
+            if start >= floor:
+                yield start, pending[start]
+                floor = pending[start]
+
+    def search(self, text, pos=0):
+        """Return (start, end) of the leftmost-longest keyword occurrence, or None"""
+        for match in self.finditer(text, pos):
+            return match
+        return None
+
+    def count(self, text, pos=0):
+        return sum(1 for _ in self.finditer(text, pos))
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    from modules.regex_parser import RegexParser
+
+    parser = RegexParser("ed+ee+f+eef")
+    parser.validate()
+    parser.add_concatenation()
+    keywords = literal_alternatives(parser.to_postfix())
+    print("Keywords:", keywords)
+
+    aho = AhoCorasick(keywords)
+    print("Trie states:", aho.trie.n_states)
+    text = "xxeefyyedzzfeeq"
+    for start, end in aho.finditer(text):
+        print(f"Match {text[start:end]!r} at [{start}, {end})")
+    print("'ee' accepted:", aho.accepts("ee"), "| 'eefe' accepted:", aho.accepts("eefe"))
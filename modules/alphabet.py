@@ -0,0 +1,68 @@
+# modules/alphabet.py
+
+from array import array
+
+DEAD = -1  # same sentinel as compiled_dfa.DEAD: character outside the alphabet
+
+
+def lookup_map(symbol_map, size=256):
+    """
+    Flat lookup list {code point: column} of size entries (256 for bytes,
+    65536 for the BMP), DEAD for characters that are not symbols.
+    """
+    lookup = array('i', [DEAD]) * size
+    for symbol, column in symbol_map.items():
+        if len(symbol) == 1 and ord(symbol) < size:
+            lookup[ord(symbol)] = column
+    return lookup
+
+
+class AlphabetClasses:
+    """
+    Partition of an alphabet into equivalence classes.
+    Two symbols share a class when no transition tells them apart, so an
+    automaton only needs one column (and one successor computation) per class.
+    Classes are numbered in the order of their smallest symbol.
+    """
+
+    def __init__(self, classes):
+        """
+        Parameters:
+        - classes: list of lists of symbols
+        """
+        self.classes = [tuple(sorted(members)) for members in classes]
+        self.classes.sort()
+        self.class_of = {symbol: i for i, members in enumerate(self.classes) for symbol in members}
+        self.representatives = [members[0] for members in self.classes]
+
+    @classmethod
+    def from_signatures(cls, signatures):
+        """
+        Group symbols by signature.
+
+        Parameters:
+        - signatures: dict {symbol: hashable description of every transition on symbol}
+        """
+        groups = {}
+        for symbol, signature in signatures.items():
+            groups.setdefault(signature, []).append(symbol)
+        return cls(list(groups.values()))
+
+    def __len__(self):
+        return len(self.classes)
+
+    def lookup(self, size=256):
+        """Flat {code point: class id} lookup, DEAD outside the alphabet"""
+        return lookup_map(self.class_of, size)
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    # a, b and c always lead to the same place, d does not
+    signatures = {'a': (1, 2), 'b': (1, 2), 'c': (1, 2), 'd': (3, 2)}
+    alphabet = AlphabetClasses.from_signatures(signatures)
+    print("Classes:", alphabet.classes)
+    print("Class of 'b':", alphabet.class_of['b'])
+    print("Lookup for a..e:", list(alphabet.lookup(128)[ord('a'):ord('f')]))
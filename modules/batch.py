@@ -0,0 +1,155 @@
+# modules/batch.py
+
+import argparse
+import mmap
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from modules import serializer
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Per-process state of a pool worker, set up once by init_worker
+worker = {}
+
+
+def line_ranges(buffer, chunk_size):
+    """
+    Split a buffer into byte ranges of about chunk_size that end on a line
+    boundary, so no line is cut between two workers.
+    """
+    size = len(buffer)
+    start = 0
+    while start < size:
+        end = min(start + chunk_size, size)
+        if end < size:
+            newline = buffer.find(b"\n", end - 1)
+            end = size if newline < 0 else newline + 1
+        yield start, end
+        start = end
+
+
+def init_worker(shm_name, size, path):
+    """Pool initializer: map the shared DFA and the corpus file once per process"""
+    # Workers only attach; the parent owns the block and unlinks it
+    shm = shared_memory.SharedMemory(name=shm_name)
+    worker["shm"] = shm
+    # The block may be rounded up to a page size; the DFA is its first size bytes
+    worker["compiled"] = serializer.loads(shm.buf[:size], verify=False)
+    with open(path, "rb") as f:
+        worker["mmap"] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def match_range(byte_range):
+    """
+    Match every line in one byte range of the corpus.
+
+    Returns:
+    - (number of lines, array of (line index, start, end) for accepted lines)
+    """
+    start, end = byte_range
+    compiled = worker["compiled"]
+    mm = worker["mmap"]
+    matches = array('q')
+    n_lines = 0
+    with memoryview(mm) as view:
+        pos = start
+        while pos < end:
+            newline = mm.find(b"\n", pos, end)
+            line_end = end if newline < 0 else newline
+            content_end = line_end
+            if content_end > pos and mm[content_end - 1] == 0x0D:  # \r\n line ending
+                content_end -= 1
+            if compiled.is_accepting(compiled.run_bytes(view[pos:content_end])):
+                matches.extend((n_lines, pos, content_end))
+            n_lines += 1
+            pos = line_end + 1
+    return n_lines, matches
+
+
+class CorpusMatcher:
+    """
+    Matches every line of a large file against one compiled DFA in a process pool.
+    The packed transition table is placed once in shared memory, where every
+    worker maps it, instead of being pickled with each task.
+    """
+
+    def __init__(self, compiled, workers=None):
+        """
+        Parameters:
+        - compiled: CompiledDFA to match with (e.g. compile(regex).compiled)
+        - workers: number of worker processes (default: CPU count)
+        """
+        self.data = serializer.dumps(compiled)
+        self.workers = workers or os.cpu_count() or 1
+
+    def iter_matches(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield (line_number, start, end) for every accepted line of the file,
+        in file order. Line numbers start at 1; start/end are byte offsets of
+        the line without its line ending.
+        """
+        if os.path.getsize(path) == 0:
+            return
+        shm = shared_memory.SharedMemory(create=True, size=len(self.data))
+        try:
+            shm.buf[:len(self.data)] = self.data
+            with open(path, "rb") as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                ranges = list(line_ranges(mm, chunk_size))
+            with ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                     initargs=(shm.name, len(self.data), path)) as pool:
+                first_line = 1
+                # map() hands results back in submission order
+                for n_lines, matches in pool.map(match_range, ranges):
+                    for k in range(0, len(matches), 3):
+                        yield first_line + matches[k], matches[k + 1], matches[k + 2]
+                    first_line += n_lines
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def count(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Number of accepted lines in the file"""
+        return sum(1 for _ in self.iter_matches(path, chunk_size))
+
+
+def main(argv=None):
+    """Command line: print the lines of FILE that the regex accepts as a whole"""
+    from modules.compiler import compile
+
+    parser = argparse.ArgumentParser(
+        prog="python -m modules.batch",
+        description="Match every line of a file against a regex using all CPU cores.")
+    parser.add_argument("regex", help="regular expression using +, * and parentheses")
+    parser.add_argument("file", help="corpus file, one record per line")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="bytes per task (default: %(default)s)")
+    parser.add_argument("-c", "--count", action="store_true", help="only print the number of matching lines")
+    parser.add_argument("-n", "--line-number", action="store_true", help="prefix lines with their line number")
+    args = parser.parse_args(argv)
+
+    matcher = CorpusMatcher(compile(args.regex).compiled, args.workers)
+    if args.count:
+        print(matcher.count(args.file, args.chunk_size))
+        return 0
+
+    out = sys.stdout.buffer
+    with open(args.file, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for line_number, start, end in matcher.iter_matches(args.file, args.chunk_size):
+            if args.line_number:
+                out.write(b"%d:" % line_number)
+            out.write(mm[start:end] + b"\n")
+    out.flush()
+    return 0
+
+
+# =======================
+# Command line usage
+# =======================
+if __name__ == "__main__":
+    sys.exit(main())
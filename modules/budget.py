@@ -0,0 +1,123 @@
+# modules/budget.py
+
+import time
+
+
+class BudgetExceeded(Exception):
+    """
+    Raised when building an automaton goes over its CompileBudget.
+    stats holds the progress made when the build was stopped.
+    """
+
+    def __init__(self, message, stats):
+        super().__init__(message)
+        self.stats = stats
+
+
+class CompileCancelled(Exception):
+    """Raised when a build is cancelled through the cancel event of its CompileBudget"""
+
+
+class CompileBudget:
+    """
+    Limits for building one automaton. Any limit may be None (unlimited).
+    - max_states: maximum number of DFA states
+    - max_bytes: maximum estimated memory of the states built so far
+    - timeout: maximum seconds spent building
+    Builds also report to two optional hooks, which are not limits:
+    - progress: callback progress(stage, count) with the states (or blocks,
+      while minimizing) built so far; may be called very often
+    - cancel: threading.Event; once it is set the build stops with CompileCancelled
+    """
+
+    def __init__(self, max_states=None, max_bytes=None, timeout=None, progress=None, cancel=None):
+        self.max_states = max_states
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.progress = progress
+        self.cancel = cancel
+
+    def key(self):
+        """Hashable form of the limits, for cache keys"""
+        return self.max_states, self.max_bytes, self.timeout
+
+    def start(self):
+        """Return a BudgetMeter for one build, with the clock starting now"""
+        return BudgetMeter(self)
+
+
+class BudgetMeter:
+    """Tracks one build against a CompileBudget"""
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.started = time.monotonic()
+
+    def tick(self, stage, count):
+        """Report progress; raise CompileCancelled if the build was cancelled"""
+        budget = self.budget
+        if budget.cancel is not None and budget.cancel.is_set():
+            raise CompileCancelled(f"Error: {stage} cancelled")
+        if budget.progress is not None:
+            budget.progress(stage, count)
+
+    def check(self, stage, states, nbytes, count=None):
+        """
+        Report progress, then raise BudgetExceeded if states, nbytes or the
+        elapsed time are over the limits.
+        states may be None for stages that add no states (only the time and
+        byte limits apply); count is the progress reported, default states.
+        """
+        self.tick(stage, states if count is None else count)
+        budget = self.budget
+        elapsed = time.monotonic() - self.started
+        if budget.max_states is not None and states is not None and states > budget.max_states:
+            reason = f"more than {budget.max_states} states"
+        elif budget.max_bytes is not None and nbytes > budget.max_bytes:
+            reason = f"more than {budget.max_bytes} bytes"
+        elif budget.timeout is not None and elapsed > budget.timeout:
+            reason = f"more than {budget.timeout} seconds"
+        else:
+            return
+        stats = {"stage": stage, "states": states, "bytes": nbytes, "elapsed": elapsed}
+        raise BudgetExceeded(f"Error: {stage} needs {reason}", stats)
+
+
+class SharedBudget:
+    """
+    A CompileBudget spread over a compile made of several builds (e.g. one
+    per memoized sub-expression). Every build started from it reports to
+    one BudgetMeter, so the timeout covers the whole compile and the state
+    and byte limits apply to all builds together.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.meter = budget.start()
+        self.states = 0  # totals over every build so far
+        self.nbytes = 0
+
+    def start(self):
+        return SharedMeter(self)
+
+
+class SharedMeter:
+    """Meter of one build under a SharedBudget: adds its counts to the shared totals"""
+
+    def __init__(self, shared):
+        self.shared = shared
+        self.states = 0
+        self.nbytes = 0
+
+    def tick(self, stage, count):
+        self.shared.meter.tick(stage, count)
+
+    def check(self, stage, states, nbytes, count=None):
+        shared = self.shared
+        if states is not None:
+            shared.states += states - self.states
+            self.states = states
+        shared.nbytes += nbytes - self.nbytes
+        self.nbytes = nbytes
+        shared.meter.check(stage, None if states is None else shared.states, shared.nbytes,
+                           states if count is None else count)
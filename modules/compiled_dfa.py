@@ -0,0 +1,244 @@
+# modules/compiled_dfa.py
+
+from array import array
+
+from modules.alphabet import AlphabetClasses, lookup_map
+
+DEAD = -1  # sentinel for a missing transition
+
+
+class CompiledDFA:
+    """
+    Dense integer form of a DFA.
+    States are renumbered 0..n-1 and the transitions are packed into a flat
+    array('i') indexed by state * n_symbols + symbol_id. Symbols that behave
+    the same everywhere share one column (symbol_map maps them to it).
+    """
+
+    def __init__(self, table, n_symbols, symbol_map, start, accepting, states=None, tags=None):
+        """
+        Initialize the compiled DFA.
+
+        Parameters:
+        - table: flat int sequence of length n_states * n_symbols (DEAD for no move)
+        - n_symbols: number of symbol columns
+        - symbol_map: dict {symbol: column}
+        - start: start state id
+        - accepting: byte per state, non-zero for final states
+        - states: optional list of original state names, indexed by state id
+        - tags: optional list of accept tag sets, indexed by state id
+        """
+        self.table = table
+        self.n_symbols = n_symbols
+        self.symbol_map = symbol_map
+        self.start = start
+        self.accepting = accepting
+        self.states = states
+        self.tags = tags
+        self.n_states = len(accepting)
+        self._byte_map = None
+        self._batch_table = None
+
+    @classmethod
+    def from_dfa(cls, dfa_transitions, start_state, final_states, tags=None):
+        """
+        Pack a DFA given as dict {state: {symbol: next_state}}.
+        The start state always gets id 0, the rest follow the dict order.
+        tags, if given, is a dict {state: frozenset of accept tags}.
+        """
+        states = [start_state] + [s for s in dfa_transitions if s != start_state]
+        state_ids = {name: i for i, name in enumerate(states)}
+
+        symbols = sorted({sym for paths in dfa_transitions.values() for sym in paths})
+        columns = {sym: array('i', [DEAD]) * len(states) for sym in symbols}
+        for name, paths in dfa_transitions.items():
+            i = state_ids[name]
+            for symbol, dest in paths.items():
+                columns[symbol][i] = state_ids[dest]
+
+        # Symbols with identical columns share one; symbol_map maps them to it
+        alphabet = AlphabetClasses.from_signatures({sym: column.tobytes() for sym, column in columns.items()})
+        n_symbols = len(alphabet)
+        table = array('i', [DEAD]) * (len(states) * n_symbols)
+        for i, symbol in enumerate(alphabet.representatives):
+            table[i::n_symbols] = columns[symbol]
+        symbol_map = alphabet.class_of
+
+        finals = set(final_states)
+        accepting = bytearray(1 if name in finals else 0 for name in states)
+        state_tags = None
+        if tags is not None:
+            state_tags = [tags.get(name, frozenset()) for name in states]
+        return cls(table, n_symbols, symbol_map, 0, accepting, states, state_tags)
+
+    def step(self, state, symbol):
+        """Return the next state id, or DEAD"""
+        column = self.symbol_map.get(symbol)
+        if column is None or state == DEAD:
+            return DEAD
+        return self.table[state * self.n_symbols + column]
+
+    def run(self, input_string, state=None):
+        """
+        Run the DFA over input_string starting at state (default: start).
+        Returns the state reached, or DEAD as soon as a transition is missing.
+        """
+        if state is None:
+            state = self.start
+        table = self.table
+        n_symbols = self.n_symbols
+        columns = self.symbol_map.get
+        for symbol in input_string:
+            column = columns(symbol)
+            if column is None:
+                return DEAD
+            state = table[state * n_symbols + column]
+            if state < 0:
+                return DEAD
+        return state
+
+    @property
+    def byte_map(self):
+        """
+        256-entry lookup {byte value: column}, DEAD for bytes that are not symbols.
+        Bytes are read as Latin-1, so ASCII symbols match their UTF-8 bytes.
+        """
+        if self._byte_map is None:
+            self._byte_map = lookup_map(self.symbol_map, 256)
+        return self._byte_map
+
+    def run_bytes(self, buffer, state=None):
+        """
+        Same as run() for a bytes-like buffer (bytes, bytearray, memoryview, mmap).
+        The buffer is read through a memoryview, so it is never copied.
+        """
+        if state is None:
+            state = self.start
+        table = self.table
+        n_symbols = self.n_symbols
+        columns = self.byte_map
+        with memoryview(buffer) as view, view.cast('B') as data:
+            for byte in data:
+                column = columns[byte]
+                if column < 0:
+                    return DEAD
+                state = table[state * n_symbols + column]
+                if state < 0:
+                    return DEAD
+        return state
+
+    def is_accepting(self, state):
+        return state != DEAD and bool(self.accepting[state])
+
+    def tags_of(self, state):
+        """Accept tags of a state id (empty for DEAD or untagged DFAs)"""
+        if state == DEAD or self.tags is None:
+            return frozenset()
+        return self.tags[state]
+
+    def accepts(self, input_string):
+        """Return True if the DFA accepts input_string"""
+        return self.is_accepting(self.run(input_string))
+
+    def batch_table(self, np):
+        """
+        Transition table extended for lockstep runs, as a flat NumPy array of
+        width n_symbols + 2:
+        - row n_states is a sink standing in for DEAD
+        - column n_symbols (padding) leaves every state where it is
+        - column n_symbols + 1 (unknown symbol) leads to the sink
+        """
+        if self._batch_table is None:
+            sink = self.n_states
+            width = self.n_symbols + 2
+            table = np.empty((self.n_states + 1, width), dtype=np.intp)
+            core = np.asarray(self.table, dtype=np.intp).reshape(self.n_states, self.n_symbols)
+            table[:sink, :self.n_symbols] = np.where(core < 0, sink, core)
+            table[sink, :] = sink
+            table[:, self.n_symbols] = np.arange(self.n_states + 1)
+            table[:, self.n_symbols + 1] = sink
+            accepting = np.zeros(self.n_states + 1, dtype=bool)
+            accepting[:sink] = np.asarray(self.accepting, dtype=np.uint8) != 0
+            self._batch_table = (table.ravel(), accepting)
+        return self._batch_table
+
+    def encode_batch(self, items, np):
+        """
+        Column ids of a batch as a (max_length, len(items)) array, one row per
+        position, padded with the padding column past the end of each string.
+        """
+        pad = self.n_symbols
+        unknown = self.n_symbols + 1
+        lengths = np.fromiter(map(len, items), dtype=np.intp, count=len(items))
+        max_length = int(lengths.max())
+
+        if isinstance(items[0], str):
+            units = np.frombuffer("".join(items).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+            top = int(units.max()) + 1 if units.size else 1
+            lookup = np.full(top, unknown, dtype=np.intp)
+            for symbol, column in self.symbol_map.items():
+                if len(symbol) == 1 and ord(symbol) < top:
+                    lookup[ord(symbol)] = column
+        else:
+            units = np.frombuffer(b"".join(items), dtype=np.uint8)
+            lookup = np.asarray(self.byte_map, dtype=np.intp)
+            lookup[lookup < 0] = unknown
+
+        # Scatter the concatenated units row by row, then transpose so that
+        # each step reads one contiguous row
+        dtype = np.uint8 if unknown < 256 else np.int32
+        codes = np.full((len(items), max_length), pad, dtype=dtype)
+        offsets = np.cumsum(lengths) - lengths
+        shift = np.arange(len(items)) * max_length - offsets
+        codes.ravel()[np.arange(units.size) + np.repeat(shift, lengths)] = lookup[units]
+        return np.ascontiguousarray(codes.T)
+
+    def accepts_batch(self, strings):
+        """
+        Test many strings at once; requires NumPy.
+        Every string is stepped in lockstep through the table, one position per
+        NumPy operation, so the interpreter loop runs max(len) times instead of
+        sum(len) times.
+
+        Parameters:
+        - strings: iterable of str, or of bytes (read as Latin-1)
+
+        Returns:
+        - NumPy bool array, True where the string is accepted
+        """
+        import numpy as np
+
+        items = list(strings)
+        if not items:
+            return np.zeros(0, dtype=bool)
+        table, accepting = self.batch_table(np)
+        width = self.n_symbols + 2
+        codes = self.encode_batch(items, np)
+
+        states = np.full(len(items), self.start, dtype=np.intp)
+        for column in codes:
+            states = table[states * width + column]
+        return accepting[states]
+
+    def state_name(self, state):
+        """Original name of a state id (the id itself if names were not kept)"""
+        if state == DEAD:
+            return None
+        return self.states[state] if self.states is not None else state
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    dfa_transitions = {
+        'q0': {'a': 'q1', 'b': 'q0'},
+        'q1': {'a': 'q1', 'b': 'q2'},
+        'q2': {'a': 'q1', 'b': 'q0'}
+    }
+    compiled = CompiledDFA.from_dfa(dfa_transitions, 'q0', ['q2'])
+
+    print("Symbols:", compiled.symbol_map)
+    print("Table:", list(compiled.table))
+    for s in ["aabb", "ab", "abc"]:
+        print(f"{s!r}:", "Accepted" if compiled.accepts(s) else "Rejected")
@@ -0,0 +1,421 @@
+# modules/compiler.py
+
+import sys
+import threading
+from collections import OrderedDict
+
+from modules.regex_parser import RegexParser
+from modules.nfa_builder import NFABuilder, ArenaNFABuilder
+from modules.dfa_builder import DFABuilder
+from modules.dfa_minimizer import DFAMinimizer
+from modules.simulator import Simulator
+from modules.nfa_simulator import NFASimulator
+from modules.budget import BudgetExceeded
+from modules.tagged_dfa import compile_groups
+from modules.searcher import Searcher
+from modules.aho_corasick import AhoCorasick, literal_alternatives
+from modules import serializer
+
+
+def normalize(regex):
+    """Cache key for a regex: the parser ignores spaces, so the key does too"""
+    return regex.replace(" ", "")
+
+
+def transitions_size(transitions):
+    """Approximate memory footprint in bytes of a {state: {symbol: dest(s)}} table"""
+    total = sys.getsizeof(transitions)
+    for paths in transitions.values():
+        total += sys.getsizeof(paths)
+        for dest in paths.values():
+            if isinstance(dest, (list, set)):
+                total += sys.getsizeof(dest)
+    return total
+
+
+def table_size(compiled):
+    """Approximate memory footprint in bytes of a CompiledDFA's packed table"""
+    return compiled.table.itemsize * len(compiled.table) + len(compiled.accepting)
+
+
+def tagged_size(tagged):
+    """Approximate memory footprint in bytes of a TaggedDFA"""
+    total = sys.getsizeof(tagged.transitions) + sys.getsizeof(tagged.finals)
+    for paths in tagged.transitions:
+        total += sys.getsizeof(paths)
+        for edge in paths.values():
+            total += sys.getsizeof(edge)
+            if edge[1] is not None:
+                total += sys.getsizeof(edge[1])
+    return total
+
+
+class CompiledPattern:
+    """
+    Result of running one regex through the whole pipeline:
+    RegexParser -> NFABuilder -> DFABuilder -> DFAMinimizer -> CompiledDFA.
+
+    A pure union of literals (like ed+ee+f) skips the automaton pipeline and
+    goes straight to an Aho-Corasick automaton; its NFA and DFA stages are
+    then only built if someone asks for them.
+
+    With an IncrementalCompiler, the minimized DFA is assembled from memoized
+    sub-expression DFAs instead, and subset construction over the whole NFA
+    only runs if someone asks for the dfa stage.
+
+    With a CompileBudget, a DFA that grows past the budget is abandoned and
+    the pattern falls back to a matcher that needs no full DFA: a LazyDFA
+    with a bounded cache ("lazy") or bit-parallel NFA simulation ("nfa").
+    Such a pattern still accepts and simulates; features that need the
+    packed table (trace, stream, search, save) raise BudgetExceeded.
+    A build cancelled through the budget's cancel event raises
+    CompileCancelled instead, with no fallback.
+
+    A lazy pattern only parses the regex up front; each stage (nfa, dfa,
+    min_dfa) is built when first asked for, and the matcher when first
+    used. The GUI builds its stages one button at a time this way.
+
+    Stages built after construction (nfa, dfa, the searcher, the tagged
+    DFA) update nbytes and report the new size to the PatternCache that
+    holds the pattern, so byte-based eviction sees them.
+    """
+
+    def __init__(self, regex, budget=None, fallback="lazy", incremental=None, lazy=False):
+        """
+        Compile the regex.
+
+        Parameters:
+        - regex: regular expression using +, *, parentheses, character
+          classes [a-z] and counted repetition {m}, {m,} or {m,n}
+        - budget: optional CompileBudget for DFA construction
+        - fallback: "lazy", "nfa", or None to let BudgetExceeded propagate
+        - incremental: optional IncrementalCompiler shared between compiles
+        - lazy: if True, build nothing but the parse until a stage or the
+          matcher is needed
+        """
+        if fallback not in ("lazy", "nfa", None):
+            raise ValueError(f"Unknown fallback engine: {fallback}")
+        parser = RegexParser(regex)
+        parser.validate()
+        parser.add_concatenation()
+        self.regex = normalize(regex)
+        self.postfix = parser.to_postfix()
+        self.budget = budget
+        self.incremental = incremental
+        self.on_budget = fallback  # fallback engine to use if the budget runs out
+        self._nfa = self._dfa = self._min_dfa = None
+        self.searcher = None  # built on first search
+        self.tagged = None  # TaggedDFA, built on first match_groups
+        self.fallback = None  # engine used when the budget was exceeded
+        self.budget_stats = None  # progress of the abandoned build
+        self.aho = None
+        self._compiled = self._simulator = self._matcher = None  # set by build()
+        self.built = False
+        self.nbytes = 0
+        self.on_resize = None  # callback(pattern, old nbytes), set by PatternCache
+        if not lazy:
+            self.build()
+
+    def build(self):
+        """Build the matcher: Aho-Corasick, the packed minimized DFA, or a fallback"""
+        if self.built:
+            return
+        keywords = literal_alternatives(self.postfix)
+        if keywords is not None:
+            self.aho = AhoCorasick(keywords)
+            self.searcher = self.aho
+            self._compiled = self.aho.trie
+            self._simulator = Simulator.from_compiled(self._compiled)
+        else:
+            try:
+                min_dfa = self.min_dfa  # from the memo, or subset construction plus minimization
+            except BudgetExceeded as error:
+                if self.on_budget is None:
+                    raise
+                self.use_fallback(self.on_budget, error)
+            else:
+                self._simulator = Simulator(*min_dfa)
+                self._compiled = self._simulator.compiled
+        if self.fallback is None:
+            self._matcher = self._simulator
+        self.built = True
+        self.update_size()
+
+    @property
+    def compiled(self):
+        """Packed minimized DFA (or Aho-Corasick trie), None when a fallback is in use"""
+        self.build()
+        return self._compiled
+
+    @property
+    def simulator(self):
+        self.build()
+        return self._simulator
+
+    @property
+    def matcher(self):
+        self.build()
+        return self._matcher
+
+    def use_fallback(self, engine, error):
+        """Switch to a matcher that works without the full DFA"""
+        self.fallback = engine
+        self.budget_stats = error.stats  # not the error: its traceback pins the partial DFA
+        self._compiled = None
+        self._dfa = self._min_dfa = None  # a DFA over budget during minimization is dropped too
+        nfa = ArenaNFABuilder().build_from_postfix(self.postfix)
+        self._simulator = NFASimulator(nfa.transitions, nfa.start_state, [nfa.final_state])
+        self._matcher = self._simulator
+        if engine == "lazy":
+            # The cache is flushed whenever it reaches the state budget
+            max_states = self.budget.max_states or 10000
+            self._matcher = DFABuilder(nfa.transitions, nfa.start_state, nfa.final_state).build_lazy(max_states)
+
+    def require_compiled(self, feature):
+        if self.compiled is None:
+            raise BudgetExceeded(f"Error: {feature} needs the full DFA, which went over the "
+                                 f"compile budget ({self.fallback} fallback in use)", self.budget_stats)
+
+    def update_size(self):
+        """Recompute nbytes after a stage was built and tell the cache holding this pattern"""
+        old = self.nbytes
+        self.nbytes = self.estimate_size()
+        if self.on_resize is not None and self.nbytes != old:
+            self.on_resize(self, old)
+
+    @property
+    def nfa(self):
+        if self._nfa is None:
+            self._nfa = NFABuilder().build_from_postfix(self.postfix)
+            self.update_size()
+        return self._nfa
+
+    @property
+    def dfa(self):
+        """(transitions, start_state, final_states) from subset construction"""
+        if self._dfa is None:
+            self._dfa = self.build_dfa(self.budget)
+            self.update_size()
+        return self._dfa
+
+    def build_dfa(self, budget=None):
+        # Reuse the displayed NFA if there is one, else build in an arena
+        nfa = self._nfa
+        if nfa is None:
+            nfa = ArenaNFABuilder().build_from_postfix(self.postfix)
+        return DFABuilder(nfa.transitions, nfa.start_state, nfa.final_state).build_dfa(budget)
+
+    @property
+    def min_dfa(self):
+        """(transitions, start_state, final_states) after minimization"""
+        if self._min_dfa is None:
+            if self.incremental is not None:
+                # Assembled from memoized sub-expression DFAs; no subset construction of the whole NFA
+                self._min_dfa = self.incremental.compile_postfix(self.postfix, self.budget)
+            else:
+                self._min_dfa = DFAMinimizer(*self.dfa).minimize(self.budget)
+            self.update_size()
+        return self._min_dfa
+
+    def estimate_size(self):
+        """Approximate memory held by this pattern, used for cache accounting"""
+        total = 0
+        if self._nfa is not None:
+            total += transitions_size(self._nfa.transitions)
+        for stage in (self._dfa, self._min_dfa):
+            if stage is not None:
+                total += transitions_size(stage[0])
+        tables = [self._compiled] if self._compiled is not None else []
+        if self.aho is not None:
+            tables.append(self.aho.automaton)
+        elif self.searcher is not None:
+            tables.append(self.searcher.reverse)
+            if self.searcher.forward is not self._compiled:
+                tables.append(self.searcher.forward)
+        for compiled in tables:
+            total += table_size(compiled)
+        if self.tagged is not None:
+            total += tagged_size(self.tagged)
+        return total
+
+    def accepts(self, input_string):
+        return self.matcher.accepts(input_string)
+
+    def accepts_batch(self, strings):
+        if self.compiled is None:
+            import numpy as np
+            return np.fromiter(map(self.matcher.accepts, strings), dtype=bool)
+        return self.simulator.accepts_batch(strings)
+
+    def simulate(self, input_string):
+        return self.simulator.simulate(input_string)
+
+    def trace(self, input_string):
+        self.require_compiled("trace")
+        return self.simulator.trace(input_string)
+
+    def stream(self):
+        self.require_compiled("stream")
+        return self.simulator.stream()
+
+    def match_groups(self, input_string):
+        """
+        Capture group spans of a whole-string match, found in one pass by a
+        tagged DFA. Returns None if rejected, else [(0, len)] followed by
+        (start, end) or None for every group in order of its '('.
+        """
+        if self.tagged is None:
+            self.tagged = compile_groups(self.regex, self.budget)
+            self.update_size()
+        return self.tagged.match(input_string)
+
+    def get_searcher(self):
+        if self.searcher is None:
+            self.require_compiled("search")
+            self.searcher = Searcher(self.postfix, self.compiled, self.budget)
+            self.update_size()
+        return self.searcher
+
+    def search(self, text, pos=0):
+        """(start, end) of the leftmost-longest match anywhere in text, or None"""
+        return self.get_searcher().search(text, pos)
+
+    def finditer(self, text, pos=0):
+        """Yield (start, end) of every non-overlapping leftmost-longest match"""
+        return self.get_searcher().finditer(text, pos)
+
+    def count(self, text, pos=0):
+        return self.get_searcher().count(text, pos)
+
+    def save(self, path):
+        """Write the packed minimized DFA to path; load it back with serializer.load"""
+        self.require_compiled("save")
+        serializer.save(self.compiled, path)
+
+
+class PatternCache:
+    """
+    Thread-safe LRU cache of CompiledPattern objects.
+    Evicts least recently used patterns when either the entry count or the
+    estimated total size exceeds its limit.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=64 * 1024 * 1024):
+        """
+        Parameters:
+        - max_entries: maximum number of cached patterns
+        - max_bytes: maximum estimated memory of all cached patterns
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # {normalized regex (plus budget): CompiledPattern}
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Return the cached pattern for key, or None"""
+        with self.lock:
+            pattern = self.entries.get(key)
+            if pattern is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return pattern
+
+    def put(self, key, pattern):
+        """Insert a pattern and evict old ones until the limits hold again"""
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.total_bytes -= old.nbytes
+            self.entries[key] = pattern
+            self.total_bytes += pattern.nbytes
+            pattern.on_resize = lambda pattern, old_nbytes: self.resize(key, pattern, old_nbytes)
+            self.evict()
+
+    def resize(self, key, pattern, old_nbytes):
+        """Account for a stage a cached pattern built after it was inserted"""
+        with self.lock:
+            if self.entries.get(key) is not pattern:
+                return  # evicted or replaced since: its bytes are no longer counted
+            self.total_bytes += pattern.nbytes - old_nbytes
+            self.evict()
+
+    def evict(self):
+        """Drop least recently used patterns until the limits hold (lock held)"""
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries
+                                         or self.total_bytes > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.total_bytes -= evicted.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+default_cache = PatternCache()
+
+
+def compile(regex, cache=None, budget=None, fallback="lazy", incremental=None, lazy=False):
+    """
+    Compile a regex, reusing a cached result when the same (normalized) regex
+    was compiled before.
+
+    Parameters:
+    - regex: regular expression string
+    - cache: PatternCache to use (default: the module-level cache)
+    - budget: optional CompileBudget; see CompiledPattern
+    - fallback: engine used when the budget is exceeded ("lazy", "nfa" or None)
+    - incremental: optional IncrementalCompiler, so a regex close to earlier
+      ones reuses their sub-expression DFAs on a cache miss
+    - lazy: build stages only when asked for (see CompiledPattern); a
+      cached pattern may already have some or all of them
+
+    Returns:
+    - CompiledPattern
+    """
+    if cache is None:
+        cache = default_cache
+    key = normalize(regex)
+    if budget is not None:
+        key = (key, budget.key(), fallback)
+    pattern = cache.get(key)
+    if pattern is None:
+        pattern = CompiledPattern(regex, budget, fallback, incremental, lazy)
+        cache.put(key, pattern)
+    return pattern
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    for regex in ["ed+ee+f(ddd+dd+d)*", "ed + ee + f(ddd+dd+d)*", "(a+b)*abb"]:
+        pattern = compile(regex)
+        print(f"{regex!r}: min DFA states = {len(pattern.min_dfa[0])}, "
+              f"'fddd' -> {pattern.accepts('fddd')}")
+
+    print("Cache stats:", default_cache.stats())
+
+    from modules.budget import CompileBudget
+    pattern = compile("(a+b)*a(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)(a+b)",
+                      budget=CompileBudget(max_states=500))
+    print("Budgeted:", pattern.fallback, pattern.budget_stats, pattern.accepts("ab" * 8))
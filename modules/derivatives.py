@@ -0,0 +1,336 @@
+# modules/derivatives.py
+
+from modules.alphabet import AlphabetClasses
+from modules.regex_parser import postfix_to_tree, postfix_symbols
+
+EXPR_BYTES = 200  # rough size of one interned expression with its table entry
+
+
+class Expr:
+    """
+    Hash-consed regex node. Each structure is created once per ExprFactory,
+    so structurally equal expressions are the same object and can be
+    compared with `is` and used as dict keys by identity.
+    kind is one of 'empty' (∅), 'eps' (ε), 'sym', 'class', 'cat', 'alt',
+    'star' or 'repeat' (args: expr, m, n with n None for no upper bound).
+    """
+    __slots__ = ("kind", "args", "nullable", "id")
+
+    def __init__(self, kind, args, nullable, id):
+        self.kind = kind
+        self.args = args
+        self.nullable = nullable
+        self.id = id
+
+    def __repr__(self):
+        if self.kind == 'empty':
+            return "∅"
+        if self.kind == 'eps':
+            return "ε"
+        if self.kind == 'sym':
+            return self.args[0]
+        if self.kind == 'class':
+            return f"[{self.args[0]}]"
+        if self.kind == 'star':
+            return f"({self.args[0]!r})*"
+        if self.kind == 'repeat':
+            expr, m, n = self.args
+            return f"({expr!r}){{{m},{'' if n is None else n}}}"
+        joiner = "" if self.kind == 'cat' else "+"
+        return "(" + joiner.join(map(repr, self.args)) + ")"
+
+
+class ExprFactory:
+    """
+    Creates simplified, hash-consed expressions.
+    The smart constructors apply the similarity rules (∅ and ε units,
+    right-nested concatenation, alternations flattened, deduplicated and
+    ordered, ε dropped beside a nullable alternative, r** = r*), so every
+    derivative lands in a canonical form and the set of distinct derivatives
+    stays finite.
+    Counted repetition stays one node with its counts: a derivative of
+    r{m,n} is d(r)·r{m-1,n-1}, so large bounds never copy r.
+    """
+
+    def __init__(self):
+        self.table = {}
+        self.empty = self.make('empty', (), False)
+        self.epsilon = self.make('eps', (), True)
+
+    def make(self, kind, args, nullable):
+        key = (kind, args)
+        expr = self.table.get(key)
+        if expr is None:
+            expr = Expr(kind, args, nullable, len(self.table))
+            self.table[key] = expr
+        return expr
+
+    def symbol(self, char):
+        return self.make('sym', (char,), False)
+
+    def char_class(self, members):
+        if len(members) == 1:
+            return self.symbol(members)
+        return self.make('class', (members,), False)
+
+    def cat(self, left, right):
+        if left is self.empty or right is self.empty:
+            return self.empty
+        if left is self.epsilon:
+            return right
+        if right is self.epsilon:
+            return left
+        if left.kind == 'cat':
+            # (ab)c -> a(bc): keep concatenations right-nested. left is already
+            # right-nested, so collect its chain and rebuild it in front of right
+            operands = []
+            while left.kind == 'cat':
+                operands.append(left.args[0])
+                left = left.args[1]
+            operands.append(left)
+            operands.append(right)
+            return self.cat_all(operands)
+        return self.make('cat', (left, right), left.nullable and right.nullable)
+
+    def cat_all(self, exprs):
+        result = self.epsilon
+        for expr in reversed(exprs):
+            result = self.cat(expr, result)
+        return result
+
+    def alt(self, exprs):
+        members = set()
+        for expr in exprs:
+            if expr.kind == 'alt':
+                members.update(expr.args)
+            elif expr is not self.empty:
+                members.add(expr)
+        if self.epsilon in members and any(expr.nullable for expr in members if expr is not self.epsilon):
+            members.discard(self.epsilon)  # ε + r = r when r matches ε anyway
+        if not members:
+            return self.empty
+        if len(members) == 1:
+            return members.pop()
+        args = tuple(sorted(members, key=lambda expr: expr.id))
+        return self.make('alt', args, any(expr.nullable for expr in args))
+
+    def star(self, expr):
+        if expr.kind == 'star':
+            return expr
+        if expr is self.empty or expr is self.epsilon:
+            return self.epsilon
+        return self.make('star', (expr,), True)
+
+    def repeat(self, expr, m, n):
+        if n == 0 or expr is self.epsilon:
+            return self.epsilon
+        if expr is self.empty:
+            return self.epsilon if m == 0 else self.empty
+        if n is None and m == 0 or expr.kind == 'star':
+            return self.star(expr)  # r{0,} = r*, and (r*){m,n} = r* for n >= 1
+        if m == n == 1:
+            return expr
+        return self.make('repeat', (expr, m, n), m == 0 or expr.nullable)
+
+    def from_postfix(self, postfix):
+        """
+        Expression for postfix output of RegexParser.to_postfix.
+        Chains of '.' and '+' are collected before building, so long
+        concatenations and alternations are built in linear time.
+        """
+        results = []
+        stack = [(postfix_to_tree(postfix), None)]
+        while stack:
+            node, operands = stack.pop()
+            kind = node[0]
+            if kind == 'sym':
+                results.append(self.symbol(node[1]))
+                continue
+            if kind == 'class':
+                results.append(self.char_class(node[1]))
+                continue
+            if operands is None:
+                operands = [node[1]]
+                if kind not in ('star', 'repeat'):
+                    # Flatten the chain of this operator in left-to-right order
+                    operands = []
+                    chain = [node]
+                    while chain:
+                        part = chain.pop()
+                        if part[0] == kind:
+                            chain.append(part[2])
+                            chain.append(part[1])
+                        else:
+                            operands.append(part)
+                stack.append((node, operands))
+                stack.extend((operand, None) for operand in reversed(operands))
+                continue
+            args = results[len(results) - len(operands):]
+            del results[len(results) - len(operands):]
+            if kind == 'cat':
+                results.append(self.cat_all(args))
+            elif kind == 'alt':
+                results.append(self.alt(args))
+            elif kind == 'repeat':
+                results.append(self.repeat(args[0], node[2], node[3]))
+            else:
+                results.append(self.star(args[0]))
+        return results[0]
+
+
+class DerivativeDFA:
+    """
+    DFA built from Brzozowski derivatives, without any NFA.
+    A state is a (canonical) expression; its successor on a symbol is the
+    derivative of the expression by that symbol, memoized per (expr, symbol).
+    States are created lazily as input arrives; build_dfa() explores all of
+    them for the dict-based pipeline. Thanks to the canonical forms the
+    result is usually minimal or close to it.
+
+    Symbols that belong to exactly the same symbols and classes of the
+    regex have the same derivative everywhere, so derivatives are computed
+    and memoized once per alphabet class: [a-z]{5} derives by one class,
+    not by 26 letters.
+    """
+
+    def __init__(self, postfix):
+        """
+        Parameters:
+        - postfix: postfix regex from RegexParser.to_postfix
+        """
+        self.exprs = ExprFactory()
+        self.start = self.exprs.from_postfix(postfix)
+        self.symbols = sorted(postfix_symbols(postfix))
+        # Signature of a symbol: the symbol and class tokens that contain it
+        signatures = {symbol: [] for symbol in self.symbols}
+        for i, token in enumerate(postfix):
+            if isinstance(token, tuple):
+                if token[0] == 'class':
+                    for symbol in token[1]:
+                        signatures[symbol].append(i)
+            elif token not in ".+*":
+                signatures[token].append(i)
+        self.alphabet = AlphabetClasses.from_signatures(
+            {symbol: tuple(indices) for symbol, indices in signatures.items()})
+        self.cache = {}  # {(expr, class id): derivative}
+
+    def derivative(self, expr, symbol):
+        """Derivative of expr by symbol (memoized per alphabet class)"""
+        class_id = self.alphabet.class_of.get(symbol)
+        if class_id is None:
+            return self.exprs.empty  # symbol not in the regex
+        return self.class_derivative(expr, class_id)
+
+    def class_derivative(self, expr, class_id):
+        """Derivative of expr by any symbol of an alphabet class (memoized)"""
+        key = (expr, class_id)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+        exprs = self.exprs
+        kind = expr.kind
+        if kind == 'sym':
+            result = exprs.epsilon if expr.args[0] == self.alphabet.representatives[class_id] else exprs.empty
+        elif kind == 'class':
+            result = exprs.epsilon if self.alphabet.representatives[class_id] in expr.args[0] else exprs.empty
+        elif kind == 'repeat':
+            inner, m, n = expr.args
+            rest = exprs.repeat(inner, max(m - 1, 0), None if n is None else n - 1)
+            result = exprs.cat(self.class_derivative(inner, class_id), rest)
+        elif kind == 'alt':
+            result = exprs.alt([self.class_derivative(arg, class_id) for arg in expr.args])
+        elif kind == 'star':
+            result = exprs.cat(self.class_derivative(expr.args[0], class_id), expr)
+        elif kind == 'cat':
+            # d(ab) = d(a)b + d(b) if a is nullable; walk the right-nested chain
+            terms = []
+            node = expr
+            while node.kind == 'cat':
+                head, rest = node.args
+                terms.append(exprs.cat(self.class_derivative(head, class_id), rest))
+                if not head.nullable:
+                    break
+                node = rest
+            else:
+                terms.append(self.class_derivative(node, class_id))
+            result = exprs.alt(terms)
+        else:
+            result = exprs.empty
+        self.cache[key] = result
+        return result
+
+    def step(self, state, symbol):
+        """Successor state, or None for the dead state ∅"""
+        result = self.derivative(state, symbol)
+        return None if result is self.exprs.empty else result
+
+    def run(self, input_string, state=None):
+        """Run from state (default: start); returns the state reached or None"""
+        if state is None:
+            state = self.start
+        for symbol in input_string:
+            state = self.step(state, symbol)
+            if state is None:
+                return None
+        return state
+
+    def accepts(self, input_string):
+        """Return True if the input string is accepted"""
+        state = self.run(input_string)
+        return state is not None and state.nullable
+
+    def build_dfa(self, budget=None):
+        """
+        Explore every derivative.
+        Returns (transitions, start_state, final_states) like DFABuilder.build_dfa,
+        with states named D0, D1, ...
+        budget is an optional CompileBudget (BudgetExceeded when it runs out).
+        """
+        meter = budget.start() if budget is not None else None
+        names = {} if self.start is self.exprs.empty else {self.start: "D0"}
+        dfa = {"D0": {}}
+        unmarked = [self.start] if names else []
+        empty = self.exprs.empty
+        while unmarked:
+            expr = unmarked.pop()
+            paths = dfa[names[expr]]
+            for class_id, members in enumerate(self.alphabet.classes):
+                target = self.class_derivative(expr, class_id)
+                if target is empty:
+                    continue
+                name = names.get(target)
+                if name is None:
+                    if meter is not None:
+                        meter.check("derivative construction", len(names) + 1,
+                                    len(self.exprs.table) * EXPR_BYTES)
+                    name = f"D{len(names)}"
+                    names[target] = name
+                    dfa[name] = {}
+                    unmarked.append(target)
+                for symbol in members:
+                    paths[symbol] = name
+        final_states = {name for expr, name in names.items() if expr.nullable}
+        return dfa, "D0", final_states
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    from modules.regex_parser import RegexParser
+
+    regex = "ed+ee+f(ddd+dd+d)*"
+    parser = RegexParser(regex)
+    parser.validate()
+    parser.add_concatenation()
+    engine = DerivativeDFA(parser.to_postfix())
+
+    print("Start expression:", engine.start)
+    for s in ["ed", "fddd", "fe"]:
+        print(f"{s!r}:", "Accepted" if engine.accepts(s) else "Rejected")
+
+    dfa, start, finals = engine.build_dfa()
+    print("\nDerivative DFA:")
+    for state, paths in dfa.items():
+        print(f"{state}: {paths}")
+    print("Final States:", finals)
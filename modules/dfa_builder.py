@@ -1,41 +1,144 @@
 # modules/dfa_builder.py
 
+import sys
+
+from modules.nfa_index import NFAIndex
+from modules.budget import BudgetExceeded
+
+
+# Rough per-state cost of a DFA state beyond its subset bitset: name, map
+# entries and a small transition dict
+STATE_OVERHEAD = 400
+
+
+class LazyState:
+    """One subset state of a LazyDFA, with its successors filled in on demand"""
+    __slots__ = ("nfa_states", "is_final", "next")
+
+    def __init__(self, nfa_states, is_final):
+        self.nfa_states = nfa_states  # bitset over NFAIndex state numbers
+        self.is_final = is_final
+        self.next = {}  # {symbol: LazyState or None}
+
+
+class LazyDFA:
+    """
+    On-the-fly DFA in the style of RE2.
+    Subset states are computed only when the input reaches them and kept in a
+    bounded cache. When the cache is full it is flushed as a whole: evicting
+    single states would leave dangling successor links behind.
+    """
+
+    def __init__(self, builder, max_states=10000):
+        """
+        Initialize the lazy DFA.
+
+        Parameters:
+        - builder: DFABuilder providing the NFA index
+        - max_states: maximum number of cached subset states
+        """
+        self.builder = builder
+        self.index = builder.index
+        self.max_states = max_states
+        self.cache = {}  # {NFA state bitset: LazyState}
+        self.states_built = 0
+        self.flushes = 0
+
+    @property
+    def start(self):
+        return self.get_state(self.builder.start_mask)
+
+    def get_state(self, nfa_states):
+        """Return the cached state for a subset, creating it if needed"""
+        state = self.cache.get(nfa_states)
+        if state is None:
+            if len(self.cache) >= self.max_states:
+                self.flush()
+            state = LazyState(nfa_states, bool(nfa_states & self.builder.final_mask))
+            self.cache[nfa_states] = state
+            self.states_built += 1
+        return state
+
+    def flush(self):
+        """Drop every cached state and the links between them"""
+        for state in self.cache.values():
+            state.next.clear()
+        self.cache.clear()
+        self.flushes += 1
+
+    def step(self, state, symbol):
+        """Return the successor of state on symbol, or None if there is none"""
+        try:
+            return state.next[symbol]
+        except KeyError:
+            pass
+        closure = self.index.follow_mask(state.nfa_states, symbol)
+        next_state = self.get_state(closure) if closure else None
+        state.next[symbol] = next_state
+        return next_state
+
+    def run(self, input_string, state=None):
+        """Run from state (default: start); returns the state reached or None"""
+        if state is None:
+            state = self.start
+        step = self.step
+        for symbol in input_string:
+            next_state = state.next.get(symbol)
+            if next_state is None:
+                next_state = step(state, symbol)
+                if next_state is None:
+                    return None
+            state = next_state
+        return state
+
+    def accepts(self, input_string):
+        """Return True if the input string is accepted"""
+        state = self.run(input_string)
+        return state is not None and state.is_final
+
+    def stats(self):
+        return {
+            "cached_states": len(self.cache),
+            "states_built": self.states_built,
+            "flushes": self.flushes,
+        }
+
+
 class DFABuilder:
-    def __init__(self, nfa_transitions, nfa_start, nfa_final):
+    def __init__(self, nfa_transitions, nfa_start, nfa_final, accept_tags=None):
         """
         Initialize the DFA Builder.
         Parameters:
         - nfa_transitions: dict {state: {symbol: [next_states]}}
         - nfa_start: start state of NFA
-        - nfa_final: final state of NFA
+        - nfa_final: final state of NFA, or a set/list of final states
+          (Glushkov automata have several)
+        - accept_tags: optional dict {nfa_state: tag}; after build_dfa, self.tags
+          maps each DFA state to the frozenset of tags of the NFA states it contains
         """
         self.nfa = nfa_transitions
         self.nfa_start = nfa_start
         self.nfa_final = nfa_final
-        self.symbols = self.get_symbols()
+        self.index = NFAIndex(nfa_transitions)
+        self.symbols = set(self.index.symbols)
+        self.alphabet = self.index.alphabet
+        self.start_mask = self.index.closures[self.index.bit[nfa_start]]
+        finals = nfa_final if isinstance(nfa_final, (set, frozenset, list, tuple)) else [nfa_final]
+        self.final_mask = self.index.mask_of(finals)
+        self.accept_tags = accept_tags or {}
+        self.tags = {}
         self.dfa = {}
         self.start_state = None
         self.final_states = set()
 
     def get_symbols(self):
         """Get all symbols used in NFA except ε"""
-        symbols = set()
-        for paths in self.nfa.values():
-            symbols.update(paths.keys())
-        symbols.discard('ε')
-        return symbols
+        return set(self.index.symbols)
 
     def epsilon_closure(self, states):
         """Compute ε-closure of a set of NFA states"""
-        stack = list(states)
-        closure = set(states)
-        while stack:
-            state = stack.pop()
-            for next_state in self.nfa.get(state, {}).get('ε', []):
-                if next_state not in closure:
-                    closure.add(next_state)
-                    stack.append(next_state)
-        return closure
+        index = self.index
+        return set(index.states_of(index.closure_of(index.mask_of(states))))
 
     def move(self, states, symbol):
         """Move NFA states on a given symbol"""
@@ -44,37 +147,71 @@ class DFABuilder:
             result.update(self.nfa.get(state, {}).get(symbol, []))
         return result
 
-    def build_dfa(self):
-        """Construct DFA using subset construction"""
-        start_set = frozenset(self.epsilon_closure([self.nfa_start]))
-        unmarked = [start_set]
-        dfa_states_map = {start_set: "D0"}
+    def build_dfa(self, budget=None):
+        """
+        Construct DFA using subset construction.
+        Subsets are interned as NFA state bitsets, and the successors of each
+        subset are grouped by alphabet class in a single pass over its members;
+        every symbol of a class then gets the same transition.
+
+        Parameters:
+        - budget: optional CompileBudget; BudgetExceeded is raised (and the
+          partial DFA dropped) as soon as a new state goes over it
+        """
+        successors = self.index.class_successors
+        classes = self.alphabet.classes
+        meter = budget.start() if budget is not None else None
+        dfa_states_map = {self.start_mask: "D0"}
+        unmarked = [self.start_mask]
         self.start_state = "D0"
         self.dfa["D0"] = {}
         state_count = 1
+        nbytes = 0  # estimated size of the interned subsets and their tables
 
         while unmarked:
             current_set = unmarked.pop()
-            current_name = dfa_states_map[current_set]
-            for symbol in self.symbols:
-                move_set = self.move(current_set, symbol)
-                closure_set = frozenset(self.epsilon_closure(move_set))
-                if not closure_set:
-                    continue
-                if closure_set not in dfa_states_map:
-                    dfa_states_map[closure_set] = f"D{state_count}"
-                    self.dfa[dfa_states_map[closure_set]] = {}
+            current_paths = self.dfa[dfa_states_map[current_set]]
+            moves = successors(current_set)
+            for symbol_class in sorted(moves):
+                closure_set = moves[symbol_class]
+                name = dfa_states_map.get(closure_set)
+                if name is None:
+                    name = f"D{state_count}"
+                    if meter is not None:
+                        nbytes += sys.getsizeof(closure_set) + STATE_OVERHEAD
+                        try:
+                            meter.check("subset construction", state_count + 1, nbytes)
+                        except BudgetExceeded:
+                            self.dfa = {}
+                            raise
+                    dfa_states_map[closure_set] = name
+                    self.dfa[name] = {}
                     unmarked.append(closure_set)
                     state_count += 1
-                self.dfa[current_name][symbol] = dfa_states_map[closure_set]
+                for symbol in classes[symbol_class]:
+                    current_paths[symbol] = name
 
         # Identify final states
         for nfa_set, dfa_name in dfa_states_map.items():
-            if self.nfa_final in nfa_set:
+            if nfa_set & self.final_mask:
                 self.final_states.add(dfa_name)
 
+        # Label states with the accept tags of their NFA states
+        tag_bits = [(1 << self.index.bit[state], tag) for state, tag in self.accept_tags.items()]
+        for nfa_set, dfa_name in dfa_states_map.items():
+            tags = frozenset(tag for bit, tag in tag_bits if nfa_set & bit)
+            if tags:
+                self.tags[dfa_name] = tags
+
         return self.dfa, self.start_state, self.final_states
 
+    def build_lazy(self, max_states=10000):
+        """
+        Return a LazyDFA that builds subset states only as input reaches them,
+        instead of running the full subset construction up front.
+        """
+        return LazyDFA(self, max_states)
+
 
 # =======================
 # Example usage
@@ -101,3 +238,8 @@ if __name__ == "__main__":
 
     print("\nStart State:", start_state)
     print("Final States:", final_states)
+
+    lazy = dfa_builder.build_lazy(max_states=4)
+    for s in ["ed", "fddd", "fdddddd", "eef"]:
+        print(f"Lazy {s!r}:", "Accepted" if lazy.accepts(s) else "Rejected")
+    print("Lazy DFA stats:", lazy.stats())
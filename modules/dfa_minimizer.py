@@ -1,9 +1,13 @@
 # modules/dfa_minimizer.py
 
-from collections import defaultdict
+from array import array
+
+from modules.alphabet import AlphabetClasses
+
+BLOCK_BYTES = 100  # rough size of one block's first/end/marked entries (list slots plus ints)
 
 class DFAMinimizer:
-    def __init__(self, dfa_transitions, start_state, final_states):
+    def __init__(self, dfa_transitions, start_state, final_states, tags=None):
         """
         Initialize the DFA Minimizer.
 
@@ -11,51 +15,172 @@ class DFAMinimizer:
         - dfa_transitions: dict {state: {symbol: next_state}}
         - start_state: DFA start state
         - final_states: list of final states
+        - tags: optional dict {state: frozenset of accept tags}; states with
+          different tag sets are never merged
         """
         self.dfa = dfa_transitions
         self.start_state = start_state
         self.final_states = set(final_states)
+        self.tags = tags or {}
+        self.minimized_tags = {}
+        self.alphabet = None
         self.states = set(dfa_transitions.keys())
         self.symbols = set()
         for paths in dfa_transitions.values():
             self.symbols.update(paths.keys())
 
-    def minimize(self):
-        """Apply Hopcroft's Algorithm to minimize DFA"""
-        # Initial partition: final and non-final states
-        P = [self.final_states, self.states - self.final_states]
-        W = [self.final_states.copy()]  # Worklist
-
-        while W:
-            A = W.pop()
-            for c in self.symbols:
-                # States that go to A on symbol c
-                X = set()
-                for s in self.states:
-                    if c in self.dfa[s] and self.dfa[s][c] in A:
-                        X.add(s)
-                new_P = []
-                for Y in P:
-                    inter = Y & X
-                    diff = Y - X
-                    if inter and diff:
-                        new_P.extend([inter, diff])
-                        if Y in W:
-                            W.remove(Y)
-                            W.extend([inter, diff])
-                        else:
-                            if len(inter) <= len(diff):
-                                W.append(inter)
-                            else:
-                                W.append(diff)
+    def state_key(self, name):
+        """Initial partition key: final flag plus accept tag set"""
+        return name in self.final_states, self.tags.get(name, frozenset())
+
+    def initial_blocks(self, names, dead=None):
+        """
+        Initial partition: final and non-final states, split further by tags.
+        The implicit dead state, if given, joins the untagged non-final block.
+        Returns a list of blocks, each a list of state indices.
+        """
+        groups = {}
+        for i, name in enumerate(names):
+            groups.setdefault(self.state_key(name), []).append(i)
+        if dead is not None:
+            groups.setdefault((False, frozenset()), []).append(dead)
+        return list(groups.values())
+
+    def minimize(self, budget=None):
+        """
+        Apply Hopcroft's Algorithm to minimize DFA.
+
+        Blocks are contiguous ranges of one element array, so a block is split
+        in time proportional to the states moved, and predecessors come from an
+        inverse transition index instead of a scan over all states. Missing
+        transitions are routed to an implicit dead state, so partial DFAs are
+        minimized correctly.
+
+        Parameters:
+        - budget: optional CompileBudget; its time and byte limits, progress
+          and cancel hooks apply here (minimizing never adds states)
+        """
+        meter = budget.start() if budget is not None else None
+        names = list(self.dfa)
+        names.extend(sorted({dest for paths in self.dfa.values() for dest in paths.values()} - self.states))
+        n = len(names)
+        index = {name: i for i, name in enumerate(names)}
+        symbols = sorted(self.symbols)
+
+        # Transition arrays per symbol; n stands for the implicit dead state
+        dead = n
+        rows = {c: array('i', [dead]) * n for c in symbols}
+        for name, paths in self.dfa.items():
+            s = index[name]
+            for c, dest in paths.items():
+                rows[c][s] = index[dest]
+        # Symbols with identical rows cannot split anything the others don't:
+        # refine on one row per alphabet class
+        self.alphabet = AlphabetClasses.from_signatures({c: row.tobytes() for c, row in rows.items()})
+        delta = [rows[c] for c in self.alphabet.representatives]
+        partial = any(dead in row for row in delta)
+        size = n + 1 if partial else n
+
+        # Inverse transition index in CSR form: sources of t on c are
+        # inv_sources[c][inv_offsets[c][t]:inv_offsets[c][t + 1]]
+        inv_offsets = []
+        inv_sources = []
+        for row in delta:
+            counts = array('i', [0]) * (size + 1)
+            for s in range(n):
+                if row[s] < size:
+                    counts[row[s] + 1] += 1
+            for t in range(size):
+                counts[t + 1] += counts[t]
+            sources = array('i', [0]) * counts[size]
+            fill = array('i', counts)
+            for s in range(n):
+                t = row[s]
+                if t < size:
+                    sources[fill[t]] = s
+                    fill[t] += 1
+            if partial:
+                # The dead state loops to itself on every symbol
+                sources.append(dead)
+                counts[size] += 1
+            inv_offsets.append(counts)
+            inv_sources.append(sources)
+
+        # Partition as contiguous blocks of the elements array
+        blocks = self.initial_blocks(names, dead if partial else None)
+        elements = array('i')
+        loc = array('i', [0]) * size
+        block_of = array('i', [0]) * size
+        first = []
+        end = []
+        for b, members in enumerate(blocks):
+            first.append(len(elements))
+            for s in members:
+                loc[s] = len(elements)
+                block_of[s] = b
+                elements.append(s)
+            end.append(len(elements))
+        marked = [0] * len(blocks)
+        # Memory of the arrays above; every new block adds its first/end/marked entries
+        base_bytes = 4 * (len(rows) * n + 3 * size + sum(len(o) + len(s) for o, s in zip(inv_offsets, inv_sources)))
+        if meter is not None:
+            meter.check("minimization", None, base_bytes + BLOCK_BYTES * len(first), len(first))
+
+        # Every initial block but the largest is a splitter
+        largest = max(range(len(blocks)), key=lambda b: end[b] - first[b])
+        worklist = [b for b in range(len(blocks)) if b != largest]
+
+        while worklist:
+            splitter = worklist.pop()
+            members = elements[first[splitter]:end[splitter]]
+            for c in range(len(delta)):
+                offsets = inv_offsets[c]
+                sources = inv_sources[c]
+                touched = []
+                for t in members:
+                    for j in range(offsets[t], offsets[t + 1]):
+                        s = sources[j]
+                        b = block_of[s]
+                        if not marked[b]:
+                            touched.append(b)
+                        # Move s into the marked prefix of its block
+                        m = first[b] + marked[b]
+                        other = elements[m]
+                        elements[m], elements[loc[s]] = s, other
+                        loc[other], loc[s] = loc[s], m
+                        marked[b] += 1
+
+                for b in touched:
+                    count = marked[b]
+                    marked[b] = 0
+                    if count == end[b] - first[b]:
+                        continue
+                    # Split b; the smaller part gets the new block id
+                    new = len(first)
+                    if count <= end[b] - first[b] - count:
+                        first.append(first[b])
+                        end.append(first[b] + count)
+                        first[b] += count
                     else:
-                        new_P.append(Y)
-                P = new_P
+                        first.append(first[b] + count)
+                        end.append(end[b])
+                        end[b] = first[b] + count
+                    marked.append(0)
+                    for p in range(first[new], end[new]):
+                        block_of[elements[p]] = new
+                    if meter is not None:
+                        meter.check("minimization", None, base_bytes + BLOCK_BYTES * len(first), len(first))
+                    # If b is still queued both halves get processed; otherwise
+                    # Hopcroft's trick says the smaller half (new) is enough
+                    worklist.append(new)
 
         # Map old states to new representative states
         state_map = {}
-        for group in P:
-            rep = sorted(group)[0]  # pick smallest name as representative
+        for b in range(len(first)):
+            group = [names[s] for s in elements[first[b]:end[b]] if s != dead]
+            if not group:
+                continue
+            rep = min(group)  # pick smallest name as representative
             for s in group:
                 state_map[s] = rep
 
@@ -70,6 +195,7 @@ class DFAMinimizer:
 
         minimized_start = state_map[self.start_state]
         minimized_final = set(state_map[s] for s in self.final_states)
+        self.minimized_tags = {state_map[s]: tags for s, tags in self.tags.items() if s in state_map}
 
         return minimized, minimized_start, minimized_final
 
@@ -0,0 +1,161 @@
+# modules/glushkov.py
+
+class GlushkovNFA:
+    """
+    ε-free position automaton: state 0 is the start, state p (1..n) stands for
+    the p-th symbol occurrence of the regex. Unlike a Thompson NFA it may have
+    several final states.
+    """
+
+    def __init__(self, start_state, final_states, transitions, positions):
+        self.start_state = start_state
+        self.final_states = final_states  # set of states
+        self.transitions = transitions  # {state: {symbol: [next_states]}}, dicts may be shared
+        self.positions = positions  # positions[p]: symbol(s) of position p (None for 0)
+
+
+class GlushkovBuilder:
+    """
+    Glushkov construction.
+    Computes nullable/first/last for every sub-expression and the follow set
+    of every position in one pass over the postfix regex, then emits n+1
+    states and no ε edges. Every edge into position q is labeled with q's
+    symbol, so subset construction and the bit-parallel simulator only ever
+    take symbol steps.
+    Position sets are int bitsets (bit p for position p).
+
+    A character class is one position with several symbols. Counted
+    repetition x{m,n} copies the positions of x (a contiguous range, since
+    positions are numbered left to right) by shifting their follow masks;
+    copies after the m-th are optional one after the other, so every copy
+    is followed only by the next one and the NFA grows linearly with n.
+    """
+
+    def link(self, follow, last, first):
+        """Every position in last can be followed by every position in first"""
+        while last:
+            low = last & -last
+            follow[low.bit_length() - 1] |= first
+            last ^= low
+
+    def concatenate(self, follow, left, right):
+        nullable1, first1, last1 = left
+        nullable2, first2, last2 = right
+        self.link(follow, last1, first2)
+        return (nullable1 and nullable2,
+                first1 | first2 if nullable1 else first1,
+                last1 | last2 if nullable2 else last2)
+
+    def repeat(self, positions, follow, operand, low, m, n):
+        """(nullable, first, last) of operand{m,n}, where the operand has positions low.."""
+        if n == 0:
+            # The operand can never be used: drop its positions
+            del positions[low:]
+            del follow[low:]
+            return True, 0, 0
+        nullable, first, last = operand
+        high = len(positions)
+        copies = [operand]
+        for _ in range((m if n is None else n) - 1):
+            shift = len(positions) - low
+            positions.extend(positions[low:high])
+            follow.extend(mask << shift for mask in follow[low:high])
+            copies.append((nullable, first << shift, last << shift))
+        if n is None:
+            # x{m,} = x{m-1} x+; for m == 0 this is x*
+            nullable, first, last = copies[-1]
+            self.link(follow, last, first)
+            copies[-1] = (nullable or m == 0, first, last)
+            required, optional = copies, []
+        else:
+            required, optional = copies[:m], copies[m:]
+        tail = (True, 0, 0)
+        for copy in reversed(optional):
+            _, first, last = self.concatenate(follow, copy, tail)
+            tail = (True, first, last)
+        for copy in reversed(required):
+            tail = self.concatenate(follow, copy, tail)
+        return tail
+
+    def build_from_postfix(self, postfix):
+        """Construct the Glushkov NFA from postfix regex (string or token list)"""
+        positions = [None]
+        follow = [0]
+        stack = []  # (nullable, first, last) per sub-expression
+        lows = []  # lowest position of each sub-expression on the stack
+        for char in postfix:
+            if isinstance(char, tuple) and char[0] == 'repeat':
+                low = lows[-1]
+                stack.append(self.repeat(positions, follow, stack.pop(), low, char[1], char[2]))
+            elif isinstance(char, tuple) and char[0] == 'class' or isinstance(char, str) and char.isalnum():
+                p = len(positions)
+                positions.append(char[1] if isinstance(char, tuple) else char)
+                follow.append(0)
+                stack.append((False, 1 << p, 1 << p))
+                lows.append(p)
+            elif char == '.':
+                right = stack.pop()
+                stack.append(self.concatenate(follow, stack.pop(), right))
+                lows.pop()
+            elif char == '+':
+                nullable2, first2, last2 = stack.pop()
+                nullable1, first1, last1 = stack.pop()
+                stack.append((nullable1 or nullable2, first1 | first2, last1 | last2))
+                lows.pop()
+            elif char == '*':
+                nullable, first, last = stack.pop()
+                self.link(follow, last, first)
+                stack.append((True, first, last))
+            else:
+                raise ValueError(f"Unknown symbol in postfix: {char}")
+        nullable, first, last = stack.pop()
+        follow[0] = first  # the start state leads into the first positions
+
+        # Positions with the same follow set (e.g. all last positions of a
+        # starred alternation) share one edge dict instead of O(n) copies each
+        transitions = {}
+        shared = {}
+        for p, targets in enumerate(follow):
+            paths = shared.get(targets)
+            if paths is None:
+                paths = {}
+                mask = targets
+                while mask:
+                    low = mask & -mask
+                    q = low.bit_length() - 1
+                    for symbol in positions[q]:
+                        paths.setdefault(symbol, []).append(q)
+                    mask ^= low
+                shared[targets] = paths
+            transitions[p] = paths
+
+        final_states = {p for p in range(1, len(positions)) if last >> p & 1}
+        if nullable:
+            final_states.add(0)
+        return GlushkovNFA(0, final_states, transitions, positions)
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    from modules.regex_parser import RegexParser
+    from modules.dfa_builder import DFABuilder
+    from modules.nfa_simulator import NFASimulator
+
+    regex = "ed+ee+f(ddd+dd+d)*"
+    parser = RegexParser(regex)
+    parser.validate()
+    parser.add_concatenation()
+    nfa = GlushkovBuilder().build_from_postfix(parser.to_postfix())
+
+    print("Glushkov NFA Transition Table:")
+    for state, paths in nfa.transitions.items():
+        print(f"{state}: {paths}")
+    print("Final States:", sorted(nfa.final_states))
+
+    dfa, start, finals = DFABuilder(nfa.transitions, nfa.start_state, nfa.final_states).build_dfa()
+    print("\nDFA states:", len(dfa))
+    simulator = NFASimulator(nfa.transitions, nfa.start_state, nfa.final_states)
+    for s in ["ed", "fddd", "fe"]:
+        print(f"{s!r}:", "Accepted" if simulator.accepts(s) else "Rejected")
@@ -0,0 +1,277 @@
+# modules/incremental.py
+
+import threading
+from collections import OrderedDict
+from itertools import count
+
+from modules.regex_parser import RegexParser
+from modules.dfa_builder import DFABuilder
+from modules.dfa_minimizer import DFAMinimizer
+from modules.budget import SharedBudget
+from modules.compiler import transitions_size
+
+
+def canonical_dfa(transitions, start, finals):
+    """
+    Rename the states of a DFA D0, D1, ... in breadth-first order from the
+    start state (symbols in sorted order), so equal minimal DFAs come out
+    identical whatever names the construction used.
+    """
+    names = {start: "D0"}
+    order = [start]
+    for state in order:
+        for symbol in sorted(transitions[state]):
+            dest = transitions[state][symbol]
+            if dest not in names:
+                names[dest] = f"D{len(names)}"
+                order.append(dest)
+    renamed = {names[state]: {symbol: names[dest] for symbol, dest in sorted(transitions[state].items())}
+               for state in order}
+    return renamed, "D0", {names[state] for state in finals if state in names}
+
+
+class GlueNFA:
+    """ε-NFA assembled from copies of already minimized sub-DFAs"""
+
+    def __init__(self):
+        self.transitions = {}  # {state: {symbol: [next_states]}}
+
+    def new_state(self):
+        state = len(self.transitions)
+        self.transitions[state] = {}
+        return state
+
+    def add(self, dfa):
+        """Copy a DFA (transitions, start, finals) in; returns (start, finals) of the copy"""
+        transitions, start, finals = dfa
+        ids = {name: self.new_state() for name in transitions}
+        for name, paths in transitions.items():
+            edges = self.transitions[ids[name]]
+            for symbol, dest in paths.items():
+                edges[symbol] = [ids[dest]]
+        return ids[start], [ids[name] for name in finals]
+
+    def epsilon(self, source, target):
+        self.transitions[source].setdefault('ε', []).append(target)
+
+
+class IncrementalCompiler:
+    """
+    Memoizes the minimized DFA of every sub-expression, so recompiling an
+    edited regex only rebuilds what the edit changed.
+
+    Sub-expressions are hash-consed: a node's key is its operator plus the
+    ids of its children (which stand for their whole subtrees), so keys hash
+    in O(1) and equal subtrees of different regexes share one entry. A node
+    missing from the memo is built from the minimized DFAs of its children,
+    glued by a small ε-NFA and run through DFABuilder and DFAMinimizer.
+    After an edit only the changed subtree and the operators above it are
+    rebuilt; everything else is a memo hit.
+
+    Chains of the same operator are flat nodes, so the operators above a
+    sub-expression are bounded by its nesting depth, not by the length of
+    the regex:
+    - a chain of alternatives is one union node over its set of branches
+    - a chain of concatenations is one node over its sequence of factors,
+      so a compile runs one subset construction per nesting level, and an
+      edit to any factor rebuilds that factor plus one concatenation
+    - runs of plain symbols are one literal node whose DFA is a chain,
+      built without subset construction
+    The top node is still rebuilt after every edit, so an edit costs about
+    as much as subset construction of the final DFA from its (minimized)
+    parts; the memo saves the work below it.
+    """
+
+    def __init__(self, max_entries=4096, max_bytes=64 * 1024 * 1024):
+        """
+        Parameters:
+        - max_entries: maximum number of memoized sub-expressions (LRU)
+        - max_bytes: maximum estimated memory of the memoized DFAs
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memo = OrderedDict()  # {key: (node id, minimized DFA, literal or None, nbytes)}
+        self.total_bytes = 0
+        self.ids = count()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.memo)
+
+    def compile(self, regex, budget=None):
+        """Minimized DFA (transitions, start_state, final_states) of a regex"""
+        parser = RegexParser(regex)
+        parser.validate()
+        parser.add_concatenation()
+        return self.compile_postfix(parser.to_postfix(), budget)
+
+    def compile_postfix(self, postfix, budget=None):
+        """
+        Minimized DFA of a postfix regex from RegexParser.to_postfix.
+
+        Parameters:
+        - postfix: postfix string or token list
+        - budget: optional CompileBudget for the whole compile; its limits
+          apply to all sub-DFAs built together
+        """
+        if budget is not None:
+            budget = SharedBudget(budget)
+        with self.lock:
+            # Per sub-expression: a node (id, minimized DFA, literal or None, nbytes),
+            # a dict {id: node} of alternatives or a list [node] of factors not yet joined
+            stack = []
+
+            def pop():
+                return self.resolve(stack.pop(), budget)
+
+            def operand():
+                item = stack.pop()
+                return item if isinstance(item, list) else [self.resolve(item, budget)]
+
+            for token in postfix:
+                if isinstance(token, tuple):
+                    if token[0] == 'class':
+                        node = self.node(('class', token[1]), [], budget)
+                    elif token[0] == 'repeat':
+                        child = pop()
+                        node = self.node(('repeat', child[0], token[1], token[2]), [child], budget)
+                    else:
+                        raise ValueError(f"Unknown token in postfix: {token}")
+                elif token == '.':
+                    right = operand()
+                    node = operand()
+                    node.extend(right)
+                elif token == '+':
+                    node = {}
+                    for item in stack[-2:]:
+                        if isinstance(item, list):
+                            item = self.resolve(item, budget)
+                        node.update(item if isinstance(item, dict) else {item[0]: item})
+                    del stack[-2:]
+                elif token == '*':
+                    child = pop()
+                    node = self.node(('star', child[0]), [child], budget)
+                else:
+                    node = self.node(('lit', token), [], budget)
+                stack.append(node)
+            return pop()[1]
+
+    def resolve(self, operand, budget):
+        """Join pending alternatives or factors into one node; other nodes pass through"""
+        if isinstance(operand, dict):
+            if len(operand) == 1:
+                return next(iter(operand.values()))  # a+a
+            ids = tuple(sorted(operand))  # union is commutative: a+b and b+a share one entry
+            return self.node(('alt',) + ids, [operand[i] for i in ids], budget)
+        if isinstance(operand, list):
+            # Adjacent literals fuse into one literal node
+            factors = []
+            run = []
+            for node in operand + [None]:
+                if node is not None and node[2] is not None:
+                    run.append(node)
+                    continue
+                if len(run) > 1:
+                    factors.append(self.node(('lit', "".join(part[2] for part in run)), [], budget))
+                else:
+                    factors.extend(run)
+                run = []
+                if node is not None:
+                    factors.append(node)
+            if len(factors) == 1:
+                return factors[0]
+            return self.node(('cat',) + tuple(node[0] for node in factors), factors, budget)
+        return operand
+
+    def node(self, key, children, budget):
+        """Memoized (node id, minimized DFA, literal, nbytes) for key, built from its children on a miss"""
+        entry = self.memo.get(key)
+        if entry is not None:
+            self.memo.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        literal = key[1] if key[0] == 'lit' else None
+        dfa = self.build(key, [child[1] for child in children], budget)
+        entry = (next(self.ids), dfa, literal, transitions_size(dfa[0]))
+        self.memo[key] = entry
+        self.total_bytes += entry[3]
+        while len(self.memo) > 1 and (len(self.memo) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, evicted = self.memo.popitem(last=False)
+            self.total_bytes -= evicted[3]
+        return entry
+
+    def build(self, key, dfas, budget):
+        """Minimized DFA of one operator applied to minimized child DFAs"""
+        kind = key[0]
+        if kind == 'lit':
+            text = key[1]
+            transitions = {f"D{i}": {symbol: f"D{i + 1}"} for i, symbol in enumerate(text)}
+            transitions[f"D{len(text)}"] = {}
+            return transitions, "D0", {f"D{len(text)}"}
+        if kind == 'class':
+            return {"D0": {symbol: "D1" for symbol in key[1]}, "D1": {}}, "D0", {"D1"}
+        if kind == 'repeat' and key[3] == 0:
+            return {"D0": {}}, "D0", {"D0"}  # x{0} matches only the empty string
+
+        nfa = GlueNFA()
+        if kind == 'cat':
+            start, finals = nfa.add(dfas[0])
+            for dfa in dfas[1:]:
+                child_start, child_finals = nfa.add(dfa)
+                for state in finals:
+                    nfa.epsilon(state, child_start)
+                finals = child_finals
+        elif kind == 'alt':
+            start = nfa.new_state()
+            finals = []
+            for dfa in dfas:
+                child_start, child_finals = nfa.add(dfa)
+                nfa.epsilon(start, child_start)
+                finals.extend(child_finals)
+        elif kind == 'star' or key[2:] == (0, None):
+            start = nfa.new_state()
+            child_start, child_finals = nfa.add(dfas[0])
+            nfa.epsilon(start, child_start)
+            for state in child_finals:
+                nfa.epsilon(state, start)
+            finals = [start]
+        else:
+            # x{m,n}: chained copies, accepting after the m-th; x{m,} loops the last copy
+            _, _, m, n = key
+            start = nfa.new_state()
+            ends = [start]
+            finals = [start] if m == 0 else []
+            for i in range(m if n is None else n):
+                copy_start, copy_finals = nfa.add(dfas[0])
+                for state in ends:
+                    nfa.epsilon(state, copy_start)
+                ends = copy_finals
+                if i + 1 >= m:
+                    finals.extend(copy_finals)
+            if n is None:
+                for state in ends:
+                    nfa.epsilon(state, copy_start)
+
+        dfa = DFABuilder(nfa.transitions, start, finals).build_dfa(budget)
+        return canonical_dfa(*DFAMinimizer(*dfa).minimize(budget))
+
+    def stats(self):
+        return {"entries": len(self.memo), "bytes": self.total_bytes, "hits": self.hits, "misses": self.misses}
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    compiler = IncrementalCompiler()
+    edits = ["ed+ee+f(ddd+dd+d)*", "ed+ee+f(ddd+dd+d)*e", "ed+ee+f(ddd+dd+dd)*e", "ed+ef+f(ddd+dd+dd)*e"]
+    for regex in edits:
+        before = compiler.stats()
+        transitions, start, finals = compiler.compile(regex)
+        after = compiler.stats()
+        print(f"{regex!r}: {len(transitions)} states, "
+              f"{after['misses'] - before['misses']} sub-expressions rebuilt, "
+              f"{after['hits'] - before['hits']} reused")
@@ -1,5 +1,12 @@
 # modules/nfa_builder.py
 
+from array import array
+from collections.abc import Mapping
+
+EPSILON = -1  # symbol of a state whose edges are ε edges
+NO_STATE = -1  # unused edge slot
+
+
 class State:
     """Represents a single NFA state"""
     def __init__(self, name):
@@ -7,14 +14,16 @@ class State:
 
 class NFA:
     """Represents an NFA with transitions"""
-    def __init__(self, start_state, final_state, transitions):
+    def __init__(self, start_state, final_state, transitions, tags=None):
         self.start_state = start_state
         self.final_state = final_state
         self.transitions = transitions  # {state: {symbol: [next_states]}}
+        self.tags = tags or {}  # {state: tag}; see NFABuilder.group
 
 class NFABuilder:
     def __init__(self):
         self.state_count = 0  # for unique state names
+        self.tags = {}  # capture tags of every state built so far
 
     def new_state(self):
         self.state_count += 1
@@ -27,6 +36,23 @@ class NFABuilder:
         transitions = {start: {symbol: [end]}, end: {}}
         return NFA(start, end, transitions)
 
+    def build_class(self, members):
+        """Build NFA for a character class: one edge per member symbol"""
+        start = self.new_state()
+        end = self.new_state()
+        transitions = {start: {symbol: [end] for symbol in members}, end: {}}
+        return NFA(start, end, transitions)
+
+    def copy(self, nfa):
+        """Copy of an NFA with fresh state names (capture tags included)"""
+        names = {state: self.new_state() for state in nfa.transitions}
+        transitions = {names[state]: {symbol: [names[d] for d in dests] for symbol, dests in paths.items()}
+                       for state, paths in nfa.transitions.items()}
+        for state, name in names.items():
+            if state in self.tags:
+                self.tags[name] = self.tags[state]
+        return NFA(names[nfa.start_state], names[nfa.final_state], transitions)
+
     def concatenate(self, nfa1, nfa2):
         """Concatenate two NFAs"""
         # Merge transitions
@@ -65,11 +91,80 @@ class NFABuilder:
         transitions[nfa.final_state]['ε'] = [nfa.start_state, end]
         return NFA(start, end, transitions)
 
+    def plus(self, nfa):
+        """One or more repetitions: the old final loops back to the start"""
+        end = self.new_state()
+        nfa.transitions[nfa.final_state]['ε'] = [nfa.start_state, end]
+        nfa.transitions[end] = {}
+        return NFA(nfa.start_state, end, nfa.transitions)
+
+    def repeat(self, nfa, m, n):
+        """
+        Counted repetition nfa{m,n} (n is None for no upper bound).
+        The copies are chained, and the end of every copy from the m-th on
+        also has an ε-edge straight to one shared final state, so {m,n} costs
+        n copies instead of the alternation of all n-m+1 counts.
+        """
+        if n == 0:
+            start = self.new_state()
+            end = self.new_state()
+            return NFA(start, end, {start: {'ε': [end]}, end: {}})
+        if n is None and m == 0:
+            return self.kleene_star(nfa)
+        copies = [nfa] + [self.copy(nfa) for _ in range((m if n is None else n) - 1)]
+        if n is None:
+            copies[-1] = self.plus(copies[-1])  # x{m,} = x{m-1} x+
+        result = None
+        for part in copies[:m]:
+            result = part if result is None else self.concatenate(result, part)
+        if n is None or n == m:
+            return result
+        end = self.new_state()
+        if result is None:
+            start = self.new_state()
+            result = NFA(start, start, {start: {}})
+        transitions = result.transitions
+        tail = result.final_state
+        for part in copies[m:]:
+            transitions.update(part.transitions)
+            transitions[tail]['ε'] = [part.start_state, end]  # enter the copy first: greedy
+            tail = part.final_state
+        transitions[tail]['ε'] = [end]
+        transitions[end] = {}
+        return NFA(result.start_state, end, transitions)
+
+    def group(self, nfa, k):
+        """
+        Capture group k around an NFA.
+        The ε-transitions into the new open and close states carry tags
+        2k-2 and 2k-1: a run passing through them records the input position
+        where the group starts and ends.
+        """
+        open_state = self.new_state()
+        close_state = self.new_state()
+        nfa.transitions[open_state] = {'ε': [nfa.start_state]}
+        nfa.transitions[nfa.final_state]['ε'] = [close_state]
+        nfa.transitions[close_state] = {}
+        self.tags[open_state] = 2 * k - 2
+        self.tags[close_state] = 2 * k - 1
+        return NFA(open_state, close_state, nfa.transitions)
+
     def build_from_postfix(self, postfix):
-        """Construct NFA from postfix regex"""
+        """
+        Construct NFA from postfix regex.
+        postfix may also be a token list from to_postfix(groups=True); the
+        NFA's tags then map the group boundary states to their tags.
+        """
         stack = []
         for char in postfix:
-            if char.isalnum():
+            if isinstance(char, tuple):
+                if char[0] == 'class':
+                    stack.append(self.build_class(char[1]))
+                elif char[0] == 'repeat':
+                    stack.append(self.repeat(stack.pop(), char[1], char[2]))
+                else:  # ('group', k)
+                    stack.append(self.group(stack.pop(), char[1]))
+            elif char.isalnum():
                 stack.append(self.build_basic(char))
             elif char == '.':
                 nfa2 = stack.pop()
@@ -84,7 +179,224 @@ class NFABuilder:
                 stack.append(self.kleene_star(nfa))
             else:
                 raise ValueError(f"Unknown symbol in postfix: {char}")
-        return stack.pop()
+        nfa = stack.pop()
+        nfa.tags = {state: tag for state, tag in self.tags.items() if state in nfa.transitions}
+        return nfa
+
+
+class Fragment:
+    """Partial NFA inside an arena: only its start and end state ids"""
+    __slots__ = ("start", "end")
+
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end
+
+
+class NFAArena:
+    """
+    Growable storage for Thompson NFA states with integer ids.
+    Every Thompson state has either one symbol edge or at most two ε edges,
+    so a state is three ints in parallel arrays: its symbol (a code point,
+    EPSILON, or a character class below EPSILON) and up to two targets.
+    """
+
+    def __init__(self):
+        self.symbols = array('i')
+        self.out1 = array('i')
+        self.out2 = array('i')
+        self.classes = []  # members of character class k, stored as symbol EPSILON - 1 - k
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def new_state(self, symbol=EPSILON, out1=NO_STATE, out2=NO_STATE):
+        self.symbols.append(symbol)
+        self.out1.append(out1)
+        self.out2.append(out2)
+        return len(self.symbols) - 1
+
+    def new_class(self, members):
+        """Symbol value standing for a character class"""
+        self.classes.append(members)
+        return EPSILON - len(self.classes)
+
+    def truncate(self, size):
+        """Drop every state from id size on"""
+        del self.symbols[size:]
+        del self.out1[size:]
+        del self.out2[size:]
+
+    def edges(self, state):
+        """Edges of one state as {symbol: [next_states]}"""
+        symbol = self.symbols[state]
+        if symbol > EPSILON:
+            return {chr(symbol): [self.out1[state]]}
+        if symbol < EPSILON:
+            targets = [self.out1[state]]
+            return {c: targets for c in self.classes[EPSILON - 1 - symbol]}
+        targets = [t for t in (self.out1[state], self.out2[state]) if t != NO_STATE]
+        return {'ε': targets} if targets else {}
+
+    @property
+    def nbytes(self):
+        return sum(a.itemsize * len(a) for a in (self.symbols, self.out1, self.out2))
+
+
+class ArenaTransitions(Mapping):
+    """
+    Read-only {state: {symbol: [next_states]}} view of an arena, so arena
+    NFAs plug into DFABuilder, NFASimulator and the visualizer. Edge dicts
+    are built on access, never stored.
+    """
+
+    def __init__(self, arena):
+        self.arena = arena
+
+    def __getitem__(self, state):
+        if not isinstance(state, int) or not 0 <= state < len(self.arena):
+            raise KeyError(state)
+        return self.arena.edges(state)
+
+    def __iter__(self):
+        return iter(range(len(self.arena)))
+
+    def __len__(self):
+        return len(self.arena)
+
+
+class ArenaNFABuilder:
+    """
+    Thompson construction into a single NFAArena.
+    Operators only add states and fill edge slots of fragment ends (which have
+    no edges yet), so building is linear in the length of the postfix regex,
+    where NFABuilder copies transition tables on every union and star.
+    Fragments from one builder share its arena.
+
+    The states of a sub-expression are always one contiguous id range ending
+    at the top of the arena, so counted repetition copies an operand by
+    appending its range with shifted targets instead of rebuilding it.
+    """
+
+    def __init__(self):
+        self.arena = NFAArena()
+
+    def build_basic(self, symbol):
+        """Fragment for a single symbol"""
+        end = self.arena.new_state()
+        start = self.arena.new_state(ord(symbol), end)
+        return Fragment(start, end)
+
+    def build_class(self, members):
+        """Fragment for a character class"""
+        end = self.arena.new_state()
+        start = self.arena.new_state(self.arena.new_class(members), end)
+        return Fragment(start, end)
+
+    def copy(self, frag, low, high):
+        """Copy of a fragment whose states are the ids low..high-1"""
+        arena = self.arena
+        shift = len(arena) - low
+        arena.symbols.extend(arena.symbols[low:high])
+        for out in (arena.out1, arena.out2):
+            out.extend(array('i', [t + shift if t != NO_STATE else NO_STATE for t in out[low:high]]))
+        return Fragment(frag.start + shift, frag.end + shift)
+
+    def concatenate(self, frag1, frag2):
+        self.arena.out1[frag1.end] = frag2.start
+        return Fragment(frag1.start, frag2.end)
+
+    def union(self, frag1, frag2):
+        end = self.arena.new_state()
+        start = self.arena.new_state(EPSILON, frag1.start, frag2.start)
+        self.arena.out1[frag1.end] = end
+        self.arena.out1[frag2.end] = end
+        return Fragment(start, end)
+
+    def kleene_star(self, frag):
+        end = self.arena.new_state()
+        start = self.arena.new_state(EPSILON, frag.start, end)
+        self.arena.out1[frag.end] = frag.start
+        self.arena.out2[frag.end] = end
+        return Fragment(start, end)
+
+    def plus(self, frag):
+        end = self.arena.new_state()
+        self.arena.out1[frag.end] = frag.start
+        self.arena.out2[frag.end] = end
+        return Fragment(frag.start, end)
+
+    def repeat(self, frag, low, m, n):
+        """
+        Counted repetition frag{m,n} of the fragment with states low..top
+        (n is None for no upper bound); see NFABuilder.repeat. The optional
+        copies share one exit state, so the NFA grows linearly with n.
+        """
+        arena = self.arena
+        if n == 0:
+            arena.truncate(low)  # the operand is never entered
+            end = arena.new_state()
+            return Fragment(arena.new_state(EPSILON, end), end)
+        if n is None and m == 0:
+            return self.kleene_star(frag)
+        high = len(arena)
+        copies = [frag] + [self.copy(frag, low, high) for _ in range((m if n is None else n) - 1)]
+        if n is None:
+            copies[-1] = self.plus(copies[-1])
+        result = None
+        for part in copies[:m]:
+            result = part if result is None else self.concatenate(result, part)
+        if n is None or n == m:
+            return result
+        end = arena.new_state()
+        if result is None:
+            gate = arena.new_state()
+            result = Fragment(gate, gate)
+        tail = result.end
+        for part in copies[m:]:
+            arena.out1[tail] = part.start  # enter the copy first: greedy
+            arena.out2[tail] = end
+            tail = part.end
+        arena.out1[tail] = end
+        return Fragment(result.start, end)
+
+    def build_fragment(self, postfix):
+        """Fragment for a postfix regex"""
+        stack = []  # (fragment, lowest state id of the fragment)
+        for char in postfix:
+            low = len(self.arena)
+            if isinstance(char, tuple):
+                if char[0] == 'class':
+                    stack.append((self.build_class(char[1]), low))
+                elif char[0] == 'repeat':
+                    frag, low = stack.pop()
+                    stack.append((self.repeat(frag, low, char[1], char[2]), low))
+                else:
+                    raise ValueError(f"Unknown token in postfix: {char}")
+            elif char.isalnum():
+                stack.append((self.build_basic(char), low))
+            elif char == '.':
+                frag2, _ = stack.pop()
+                frag1, low = stack.pop()
+                stack.append((self.concatenate(frag1, frag2), low))
+            elif char == '+':
+                frag2, _ = stack.pop()
+                frag1, low = stack.pop()
+                stack.append((self.union(frag1, frag2), low))
+            elif char == '*':
+                frag, low = stack.pop()
+                stack.append((self.kleene_star(frag), low))
+            else:
+                raise ValueError(f"Unknown symbol in postfix: {char}")
+        return stack.pop()[0]
+
+    def build_from_postfix(self, postfix):
+        """Construct an NFA with integer states whose transitions view the arena"""
+        return self.to_nfa(self.build_fragment(postfix))
+
+    def to_nfa(self, frag):
+        """NFA for a fragment built by this builder"""
+        return NFA(frag.start, frag.end, ArenaTransitions(self.arena))
 
 
 # =======================
@@ -109,3 +421,8 @@ if __name__ == "__main__":
 
     print("\nStart State:", nfa.start_state)
     print("Final State:", nfa.final_state)
+
+    arena_builder = ArenaNFABuilder()
+    arena_nfa = arena_builder.build_from_postfix(postfix)
+    print("\nArena NFA:", len(arena_builder.arena), "states,", arena_builder.arena.nbytes, "bytes")
+    print("Start State:", arena_nfa.start_state, "| Final State:", arena_nfa.final_state)
@@ -0,0 +1,188 @@
+# modules/nfa_index.py
+
+from modules.alphabet import AlphabetClasses
+
+
+class NFAIndex:
+    """
+    Integer view of an NFA shared by the DFA builder and the NFA simulator.
+    NFA states are numbered 0..m-1 and sets of states are int bitsets.
+    ε-closures are computed once for every state by condensing the strongly
+    connected components of the ε-graph, and every state's symbol edges are
+    pre-closed into follow masks.
+    """
+
+    def __init__(self, nfa_transitions):
+        """
+        Build the index.
+
+        Parameters:
+        - nfa_transitions: dict {state: {symbol: [next_states]}}
+        """
+        self.nfa = nfa_transitions
+
+        states = list(nfa_transitions)
+        for paths in nfa_transitions.values():
+            for dests in paths.values():
+                states.extend(d for d in dests if d not in nfa_transitions)
+        self.state_list = list(dict.fromkeys(states))
+        self.bit = {name: i for i, name in enumerate(self.state_list)}
+
+        self.closures = self.compute_closures()
+
+        # moves[i]: [(symbol, follow mask)] for the symbol edges leaving state i
+        # follow[symbol]: {i: follow mask}; symbol_masks[symbol]: states with a symbol edge
+        self.moves = [[] for _ in self.state_list]
+        self.follow = {}
+        self.symbol_masks = {}
+        # {id(dests): (dests, mask)} for edge lists shared between states;
+        # holding dests keeps its id from being reused while the dict lives
+        dest_masks = {}
+        for name, paths in nfa_transitions.items():
+            i = self.bit[name]
+            for symbol, dests in paths.items():
+                if symbol == 'ε':
+                    continue
+                entry = dest_masks.get(id(dests))
+                if entry is not None:
+                    mask = entry[1]
+                else:
+                    mask = 0
+                    for dest in dests:
+                        mask |= self.closures[self.bit[dest]]
+                    dest_masks[id(dests)] = (dests, mask)
+                self.moves[i].append((symbol, mask))
+                self.follow.setdefault(symbol, {})[i] = mask
+                self.symbol_masks[symbol] = self.symbol_masks.get(symbol, 0) | (1 << i)
+        self.symbols = sorted(self.follow)
+
+        # Symbols with the same follow masks from every state are interchangeable;
+        # class_moves[i]: [(class id, follow mask)] with one entry per class
+        self.alphabet = AlphabetClasses.from_signatures(
+            {symbol: tuple(sorted(follow.items())) for symbol, follow in self.follow.items()})
+        class_of = self.alphabet.class_of
+        representatives = set(self.alphabet.representatives)
+        self.class_moves = [[(class_of[symbol], mask) for symbol, mask in moves if symbol in representatives]
+                            for moves in self.moves]
+
+    def compute_closures(self):
+        """
+        ε-closure mask of every state.
+        Tarjan's algorithm emits each SCC after every SCC reachable from it, so
+        one pass can OR the closures of the successor components together.
+        """
+        n = len(self.state_list)
+        epsilon = [[self.bit[d] for d in self.nfa.get(name, {}).get('ε', [])]
+                   for name in self.state_list]
+        if not any(epsilon):
+            # ε-free NFA (e.g. Glushkov): every state is its own closure
+            return [1 << i for i in range(n)]
+
+        closures = [0] * n
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, edge = work.pop()
+                if edge == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                if edge < len(epsilon[v]):
+                    work.append((v, edge + 1))
+                    w = epsilon[v][edge]
+                    if index[w] == -1:
+                        work.append((w, 0))
+                    elif on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                    continue
+                # All edges of v done: propagate lowlink to the parent
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    mask = 0
+                    for w in component:
+                        mask |= 1 << w
+                    for w in component:
+                        for x in epsilon[w]:
+                            mask |= closures[x]
+                    for w in component:
+                        closures[w] = mask
+        return closures
+
+    def mask_of(self, states):
+        """Bitset of a collection of state names"""
+        mask = 0
+        for name in states:
+            mask |= 1 << self.bit[name]
+        return mask
+
+    def closure_of(self, mask):
+        """ε-closure of a bitset"""
+        result = mask
+        while mask:
+            low = mask & -mask
+            result |= self.closures[low.bit_length() - 1]
+            mask ^= low
+        return result
+
+    def follow_mask(self, mask, symbol):
+        """ε-closure of the states reached from mask on symbol"""
+        follow = self.follow.get(symbol)
+        active = mask & self.symbol_masks.get(symbol, 0)
+        result = 0
+        while active:
+            low = active & -active
+            result |= follow[low.bit_length() - 1]
+            active ^= low
+        return result
+
+    def successors(self, mask):
+        """
+        Group the successors of a state set in one pass over its members.
+        Returns dict {symbol: follow mask}.
+        """
+        moves = self.moves
+        result = {}
+        while mask:
+            low = mask & -mask
+            for symbol, follow in moves[low.bit_length() - 1]:
+                result[symbol] = result.get(symbol, 0) | follow
+            mask ^= low
+        return result
+
+    def class_successors(self, mask):
+        """Same as successors(), keyed by alphabet class id instead of symbol"""
+        moves = self.class_moves
+        result = {}
+        while mask:
+            low = mask & -mask
+            for symbol_class, follow in moves[low.bit_length() - 1]:
+                result[symbol_class] = result.get(symbol_class, 0) | follow
+            mask ^= low
+        return result
+
+    def states_of(self, mask):
+        """Decode a bitset into a frozenset of state names"""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self.state_list[low.bit_length() - 1])
+            mask ^= low
+        return frozenset(names)
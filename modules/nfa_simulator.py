@@ -0,0 +1,130 @@
+# modules/nfa_simulator.py
+
+from modules.nfa_index import NFAIndex
+
+
+class NFASimulator:
+    """
+    Bit-parallel NFA Simulator class.
+    Matches directly on an NFA without determinizing it. A set of NFA states
+    is a Python int with one bit per state; each input symbol is handled with
+    precomputed ε-closure/follow masks looked up 8 states at a time, so a
+    string of length n is matched in O(n·m) for an NFA with m states.
+    """
+
+    CHUNK = 8  # states per lookup-table chunk
+
+    def __init__(self, nfa_transitions, start_state, final_states):
+        """
+        Initialize the simulator with NFA.
+
+        Parameters:
+        - nfa_transitions: dict {state: {symbol: [next_states]}}
+        - start_state: starting state of NFA
+        - final_states: list of final states
+        """
+        self.nfa = nfa_transitions
+        self.start_state = start_state
+        self.final_states = final_states
+
+        self.index = NFAIndex(nfa_transitions)
+        self.state_list = self.index.state_list
+        # follow[symbol][i]: ε-closure of the states reached from state i on symbol
+        self.follow = self.index.follow
+        self.symbol_masks = self.index.symbol_masks
+
+        self.start_mask = self.index.closures[self.index.bit[start_state]]
+        self.final_mask = self.index.mask_of(final_states)
+
+        n_chunks = (len(self.state_list) + self.CHUNK - 1) // self.CHUNK
+        # chunk_tables[symbol][k]: {byte value of states 8k..8k+7: follow mask}
+        self.chunk_tables = {symbol: [{} for _ in range(n_chunks)] for symbol in self.follow}
+
+    def fill_chunk(self, symbol, k, value):
+        """Compute and memoize the follow mask for one 8-state chunk"""
+        follow = self.follow[symbol]
+        base = k * self.CHUNK
+        mask = 0
+        for j in range(self.CHUNK):
+            if value >> j & 1:
+                mask |= follow.get(base + j, 0)
+        self.chunk_tables[symbol][k][value] = mask
+        return mask
+
+    def step(self, mask, symbol):
+        """Return the state mask reached from mask on symbol (0 if none)"""
+        active = mask & self.symbol_masks.get(symbol, 0)
+        if not active:
+            return 0
+        tables = self.chunk_tables[symbol]
+        first = ((active & -active).bit_length() - 1) // self.CHUNK
+        span = (active.bit_length() + self.CHUNK - 1) // self.CHUNK - first
+        result = 0
+        for k, value in enumerate((active >> (first * self.CHUNK)).to_bytes(span, "little"), first):
+            if value:
+                table = tables[k]
+                follow = table.get(value)
+                if follow is None:
+                    follow = self.fill_chunk(symbol, k, value)
+                result |= follow
+        return result
+
+    def run(self, input_string, mask=None):
+        """Run from mask (default: start); returns the state mask reached, 0 if none"""
+        if mask is None:
+            mask = self.start_mask
+        step = self.step
+        for symbol in input_string:
+            mask = step(mask, symbol)
+            if not mask:
+                return 0
+        return mask
+
+    def accepts(self, input_string):
+        """Return True if the NFA accepts input_string"""
+        return bool(self.run(input_string) & self.final_mask)
+
+    def states_of(self, mask):
+        """Decode a state mask into a frozenset of NFA state names"""
+        return self.index.states_of(mask)
+
+    def simulate(self, input_string):
+        """
+        Simulate the NFA on input string.
+
+        Returns:
+        - transitions_list: list of tuples (current_states, symbol, next_states),
+          where states are frozensets of NFA states and next_states is None
+          when no state survives
+        - accepted: boolean indicating if string is accepted
+        """
+        mask = self.start_mask
+        transitions_list = []
+        for symbol in input_string:
+            next_mask = self.step(mask, symbol)
+            if not next_mask:
+                transitions_list.append((self.states_of(mask), symbol, None))
+                return transitions_list, False
+            transitions_list.append((self.states_of(mask), symbol, self.states_of(next_mask)))
+            mask = next_mask
+        return transitions_list, bool(mask & self.final_mask)
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    from modules.regex_parser import RegexParser
+    from modules.nfa_builder import NFABuilder
+
+    # The DFA for this pattern needs 2^n states; the NFA stays linear
+    regex = "(a+b)*a" + "(a+b)" * 12
+    parser = RegexParser(regex)
+    parser.validate()
+    parser.add_concatenation()
+    nfa = NFABuilder().build_from_postfix(parser.to_postfix())
+
+    simulator = NFASimulator(nfa.transitions, nfa.start_state, [nfa.final_state])
+    print("NFA states:", len(simulator.state_list))
+    for s in ["a" + "b" * 12, "b" * 13, "ab" * 20]:
+        print(f"{s!r}:", "Accepted" if simulator.accepts(s) else "Rejected")
@@ -0,0 +1,67 @@
+# modules/pattern_set.py
+
+from modules.regex_parser import RegexParser
+from modules.nfa_builder import ArenaNFABuilder
+from modules.dfa_builder import DFABuilder
+from modules.dfa_minimizer import DFAMinimizer
+from modules.compiled_dfa import CompiledDFA
+
+
+class PatternSet:
+    """
+    Many regexes matched together in one pass.
+    The pattern NFAs are joined with ArenaNFABuilder.union and determinized once;
+    every accepting DFA state is tagged with the indices of the patterns that
+    accept there, and minimization keeps states with different tags apart.
+    """
+
+    def __init__(self, regexes):
+        """
+        Build the combined automaton.
+
+        Parameters:
+        - regexes: list of regular expressions; results refer to them by index
+        """
+        if not regexes:
+            raise ValueError("Error: PatternSet needs at least one regex")
+        self.regexes = list(regexes)
+
+        builder = ArenaNFABuilder()  # one arena, so state ids stay unique across patterns
+        accept_tags = {}
+        combined = None
+        for i, regex in enumerate(self.regexes):
+            parser = RegexParser(regex)
+            parser.validate()
+            parser.add_concatenation()
+            fragment = builder.build_fragment(parser.to_postfix())
+            accept_tags[fragment.end] = i
+            combined = fragment if combined is None else builder.union(combined, fragment)
+        self.nfa = combined = builder.to_nfa(combined)
+
+        dfa_builder = DFABuilder(combined.transitions, combined.start_state,
+                                 combined.final_state, accept_tags)
+        self.dfa = dfa_builder.build_dfa()
+        minimizer = DFAMinimizer(*self.dfa, tags=dfa_builder.tags)
+        self.min_dfa = minimizer.minimize()
+        self.compiled = CompiledDFA.from_dfa(*self.min_dfa, tags=minimizer.minimized_tags)
+
+    def match(self, input_string):
+        """
+        Return the sorted indices of every pattern that accepts input_string.
+        """
+        return sorted(self.compiled.tags_of(self.compiled.run(input_string)))
+
+    def match_regexes(self, input_string):
+        """Same as match(), returning the regexes themselves"""
+        return [self.regexes[i] for i in self.match(input_string)]
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    rules = ["ed+ee", "f(ddd+dd+d)*", "(e+f)d*", "(a+b)*abb"]
+    pattern_set = PatternSet(rules)
+    print("Combined minimized DFA states:", len(pattern_set.min_dfa[0]))
+    for s in ["ed", "fdd", "f", "aabb", "ee", "x"]:
+        print(f"{s!r}: {pattern_set.match_regexes(s)}")
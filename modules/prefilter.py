@@ -0,0 +1,209 @@
+# modules/prefilter.py
+
+from modules.regex_parser import postfix_to_tree, tree_children
+
+MAX_LITERALS = 64  # larger literal sets are dropped as not selective
+
+
+class LiteralInfo:
+    """
+    Literal facts about one sub-expression.
+    - exact: the complete set of strings it matches, if small and finite
+    - prefixes: every match starts with one of these
+    - suffixes: every match ends with one of these
+    - required: every match contains one of these
+    Any of them is None when unknown.
+    """
+    __slots__ = ("exact", "prefixes", "suffixes", "required")
+
+    def __init__(self, exact=None, prefixes=None, suffixes=None, required=None):
+        self.exact = exact
+        self.prefixes = prefixes
+        self.suffixes = suffixes
+        self.required = required
+
+
+def simplify(literals, keep=lambda short, long: long.startswith(short)):
+    """
+    Drop literals made redundant by a shorter one; None if the set is useless
+    (too large, or containing the empty string, which every text contains).
+    """
+    if literals is None or "" in literals or len(literals) > MAX_LITERALS:
+        return None
+    result = []
+    for literal in sorted(literals, key=len):
+        if not any(keep(short, literal) for short in result):
+            result.append(literal)
+    return frozenset(result)
+
+
+def simplify_suffixes(literals):
+    return simplify(literals, keep=lambda short, long: long.endswith(short))
+
+
+def simplify_required(literals):
+    return simplify(literals, keep=lambda short, long: short in long)
+
+
+def product(left, right):
+    if left is None or right is None or len(left) * len(right) > MAX_LITERALS:
+        return None
+    return {a + b for a in left for b in right}
+
+
+def better(a, b):
+    """The more selective of two required-literal sets"""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a if min(map(len, a)) >= min(map(len, b)) else b
+
+
+def analyze(node, children):
+    kind = node[0]
+    if kind == 'sym':
+        literal = frozenset({node[1]})
+        return LiteralInfo(set(literal), literal, literal, literal)
+    if kind == 'class':
+        literal = frozenset(node[1])
+        if len(literal) > MAX_LITERALS:
+            return LiteralInfo()
+        return LiteralInfo(set(literal), literal, literal, literal)
+    if kind == 'star':
+        # Matches the empty string and arbitrary repetitions: nothing required
+        return LiteralInfo()
+    if kind == 'repeat':
+        _, _, m, n = node
+        if m == 0:
+            return LiteralInfo()
+        # x{m,n} = x^m followed by optional copies; facts of x^k (k <= m)
+        # still hold for x^m, so stop once the exact set is lost
+        child = children[0]
+        info = child
+        for _ in range(m - 1):
+            if info.exact is None:
+                break
+            info = analyze(('cat',), [info, child])
+        if n != m:
+            info = analyze(('cat',), [info, LiteralInfo()])
+        return info
+    left, right = children
+    if kind == 'alt':
+        exact = None
+        if left.exact is not None and right.exact is not None:
+            exact = left.exact | right.exact
+            if len(exact) > MAX_LITERALS:
+                exact = None
+        prefixes = suffixes = required = None
+        if left.prefixes is not None and right.prefixes is not None:
+            prefixes = simplify(left.prefixes | right.prefixes)
+        if left.suffixes is not None and right.suffixes is not None:
+            suffixes = simplify_suffixes(left.suffixes | right.suffixes)
+        if left.required is not None and right.required is not None:
+            required = simplify_required(left.required | right.required)
+        return LiteralInfo(exact, prefixes, suffixes, required)
+
+    # Concatenation
+    exact = product(left.exact, right.exact)
+    if left.exact is not None:
+        prefixes = simplify(product(left.exact, right.prefixes)) or simplify(left.exact)
+    else:
+        prefixes = left.prefixes
+    if right.exact is not None:
+        suffixes = simplify_suffixes(product(left.suffixes, right.exact)) or simplify_suffixes(right.exact)
+    else:
+        suffixes = right.suffixes
+    # A match ends a left part and starts a right part, so it contains both
+    required = better(left.required, right.required)
+    required = better(simplify_required(product(left.suffixes, right.prefixes)), required)
+    if exact is not None:
+        required = better(simplify_required(exact), required)
+    return LiteralInfo(exact, prefixes, suffixes, required)
+
+
+class Prefilter:
+    """
+    Literal prefilter for search.
+    prefixes: every match starts with one of these literals (or None);
+    required: every match contains one of these literals (or None).
+    """
+
+    def __init__(self, prefixes, required):
+        self.prefixes = prefixes
+        self.required = required
+
+    @classmethod
+    def from_postfix(cls, postfix):
+        """Analyze postfix output of RegexParser.to_postfix bottom-up"""
+        results = []
+        stack = [(postfix_to_tree(postfix), False)]
+        while stack:
+            node, expanded = stack.pop()
+            arity = len(tree_children(node))
+            if arity and not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in reversed(tree_children(node)))
+                continue
+            children = results[len(results) - arity:] if arity else []
+            del results[len(results) - arity:]
+            results.append(analyze(node, children))
+        info = results[0]
+        return cls(info.prefixes, info.required)
+
+    def may_match(self, text, pos=0):
+        """False only if text[pos:] cannot contain a match"""
+        if self.required is None:
+            return True
+        return LiteralScanner(self.required, text).find(pos) >= 0
+
+
+class LiteralScanner:
+    """
+    Finds the next occurrence of any literal from a small set.
+    Uses str.find / bytes.find per literal and remembers each literal's next
+    occurrence, so a left-to-right scan reads the text about once per literal.
+    """
+
+    def __init__(self, literals, text):
+        """
+        Parameters:
+        - literals: literal strings to look for
+        - text: str, or bytes-like object with a find method (bytes, bytearray, mmap)
+        """
+        if not isinstance(text, str):
+            # Bytes are read as Latin-1; other literals can never occur
+            literals = [literal.encode("latin-1") for literal in literals
+                        if max(map(ord, literal)) < 256]
+        self.text = text
+        self.next = {literal: -1 for literal in literals}  # -1: not searched yet
+
+    def find(self, pos):
+        """Smallest offset >= pos where some literal occurs, or -1"""
+        best = -1
+        for literal, found in self.next.items():
+            if found is None:
+                continue  # no more occurrences
+            if found < pos:
+                found = self.text.find(literal, pos)
+                self.next[literal] = found if found >= 0 else None
+                if found < 0:
+                    continue
+            if best < 0 or found < best:
+                best = found
+        return best
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    from modules.regex_parser import RegexParser
+
+    for regex in ["ed+ee+f(ddd+dd+d)*", "(a+b)*abb", "x(ab+cd)y*z"]:
+        parser = RegexParser(regex)
+        parser.validate()
+        parser.add_concatenation()
+        prefilter = Prefilter.from_postfix(parser.to_postfix())
+        print(f"{regex!r}: prefixes={sorted(prefilter.prefixes or [])} "
+              f"required={sorted(prefilter.required or [])}")
@@ -1,24 +1,132 @@
 # modules/regex_parser.py
 
+MAX_REPEAT = 1000  # largest count allowed in {m,n}, as in RE2
+
+
+def parse_class(atom, position):
+    """
+    Members of a character class atom like "[a-f0-9x]", as a sorted string.
+    Members and range ends must be alphanumeric; negation is not supported,
+    since the alphabet of a regex is just the symbols it mentions.
+    """
+    body = atom[1:-1]
+    if not body:
+        raise ValueError(f"Error: Empty character class at position {position}")
+    if body[0] == "^":
+        raise ValueError(f"Error: Negated character class at position {position} is not supported")
+    members = set()
+    i = 0
+    while i < len(body):
+        if i + 2 < len(body) and body[i + 1] == "-":
+            low, high = body[i], body[i + 2]
+            span = [chr(c) for c in range(ord(low), ord(high) + 1)]
+            if not span or not all(c.isalnum() for c in span):
+                raise ValueError(f"Error: Invalid range '{low}-{high}' at position {position}")
+            members.update(span)
+            i += 3
+        else:
+            if not body[i].isalnum():
+                raise ValueError(f"Error: Invalid symbol '{body[i]}' in character class at position {position}")
+            members.add(body[i])
+            i += 1
+    return "".join(sorted(members))
+
+
+def parse_repeat(atom, position):
+    """Bounds (m, n) of a counted repetition atom "{m}", "{m,}" or "{m,n}"; n is None if unbounded"""
+    low, comma, high = atom[1:-1].partition(",")
+    if not low.isdigit() or (high and not high.isdigit()):
+        raise ValueError(f"Error: Invalid repetition '{atom}' at position {position}")
+    m = int(low)
+    n = m if not comma else int(high) if high else None
+    if n is not None and m > n:
+        raise ValueError(f"Error: Invalid repetition '{atom}' at position {position} (min > max)")
+    if max(m, n or 0) > MAX_REPEAT:
+        raise ValueError(f"Error: Repetition count above {MAX_REPEAT} at position {position}")
+    return m, n
+
+
+def token_text(token):
+    """Printable form of one postfix token"""
+    if isinstance(token, str):
+        return token
+    if token[0] == 'class':
+        return f"[{token[1]}]"
+    if token[0] == 'repeat':
+        m, n = token[1], token[2]
+        return f"{{{m}}}" if m == n else f"{{{m},}}" if n is None else f"{{{m},{n}}}"
+    return f"<{token[0]} {token[1]}>"
+
+
+def postfix_text(postfix):
+    """Printable form of to_postfix() output, string or token list"""
+    return postfix if isinstance(postfix, str) else "".join(map(token_text, postfix))
+
+
+def postfix_symbols(postfix):
+    """Set of input symbols a postfix regex mentions, character class members included"""
+    symbols = set()
+    for token in postfix:
+        if isinstance(token, tuple):
+            if token[0] == 'class':
+                symbols.update(token[1])
+        elif token not in ".+*":
+            symbols.add(token)
+    return symbols
+
+
+def join_tokens(tokens):
+    """Postfix as a string when every token is a plain character, else as a list"""
+    if all(isinstance(token, str) for token in tokens):
+        return "".join(tokens)
+    return tokens
+
+
 class RegexParser:
     def __init__(self, regex):
         self.regex = regex.replace(" ", "")  # Remove spaces
         self.postfix = ""
 
+    def atoms(self):
+        """
+        Yield (position, atom) for the regex: single characters, except that a
+        character class "[...]" or a counted repetition "{...}" is one atom.
+        """
+        i = 0
+        regex = self.regex
+        while i < len(regex):
+            char = regex[i]
+            if char in "[{":
+                close = "]" if char == "[" else "}"
+                end = regex.find(close, i)
+                if end < 0:
+                    raise ValueError(f"Error: Unmatched '{char}' at position {i}")
+                yield i, regex[i:end + 1]
+                i = end + 1
+            else:
+                yield i, char
+                i += 1
+
     def validate(self):
-        """Validate the regex for unmatched parentheses and invalid operators."""
+        """Validate the regex for unmatched parentheses and brackets and invalid operators."""
         stack = []
         prev_char = ""
-        for i, char in enumerate(self.regex):
+        for i, char in self.atoms():
             if char == "(":
                 stack.append(i)
             elif char == ")":
                 if not stack:
                     raise ValueError(f"Error: Unmatched ')' at position {i}")
                 stack.pop()
-            elif char in "+*":
+            elif char in "]}":
+                raise ValueError(f"Error: Unmatched '{char}' at position {i}")
+            elif char[0] == "[":
+                parse_class(char, i)
+            elif char in "+*" or char[0] == "{":
                 if prev_char in "+*(" or prev_char == "":
                     raise ValueError(f"Error: Invalid operator '{char}' at position {i}")
+                if char[0] == "{":
+                    parse_repeat(char, i)
             prev_char = char
         if stack:
             raise ValueError(f"Error: Unmatched '(' at position {stack.pop()}")
@@ -26,50 +134,146 @@ class RegexParser:
     def add_concatenation(self):
         """Add explicit concatenation operator '.' for Thompson's construction"""
         result = ""
-        operators = set("()+*")
         prev = ""
-        for char in self.regex:
-            if prev and (prev not in operators or prev == ")" or prev == "*") and (char not in operators or char == "("):
+        for _, atom in self.atoms():
+            # prev ends an operand (symbol, class, ')', '*', '{..}') and atom starts one
+            if prev and prev not in "(+" and atom not in ")+*" and atom[0] != "{":
                 result += "."
-            result += char
-            prev = char
+            result += atom
+            prev = atom
         self.regex = result
 
-    def to_postfix(self):
-        """Convert infix regex to postfix using Shunting Yard algorithm"""
+    def to_postfix(self, groups=False):
+        """
+        Convert infix regex to postfix using Shunting Yard algorithm.
+
+        The result is a string of symbols and operators, or a list of tokens
+        when the regex uses character classes or counted repetition:
+        ('class', members) is an operand matching any one of the member
+        symbols, and ('repeat', m, n) is a postfix operator repeating the
+        operand before it m to n times (n is None for no upper bound).
+
+        With groups=True the parenthesized groups are kept: the result is
+        always a token list, where ('group', k) closes capture group k
+        (numbered by its '(' from 1, as in Python's re) around the operand
+        before it. self.groups is set to the number of groups.
+        """
         precedence = {'*': 3, '.': 2, '+': 1}
-        output = ""
+        output = []
         stack = []
-        for char in self.regex:
+        open_groups = []
+        self.groups = 0
+        for i, char in self.atoms():
             if char.isalnum():  # Operand
-                output += char
+                output.append(char)
+            elif char[0] == "[":
+                output.append(('class', parse_class(char, i)))
+            elif char[0] == "{":
+                # Postfix operator binding tighter than anything on the stack
+                output.append(('repeat',) + parse_repeat(char, i))
             elif char == "(":
                 stack.append(char)
+                self.groups += 1
+                open_groups.append(self.groups)
             elif char == ")":
                 while stack and stack[-1] != "(":
-                    output += stack.pop()
+                    output.append(stack.pop())
                 stack.pop()  # Remove '('
+                group = open_groups.pop()
+                if groups:
+                    output.append(('group', group))
             else:  # Operator
                 while stack and stack[-1] != "(" and precedence[stack[-1]] >= precedence[char]:
-                    output += stack.pop()
+                    output.append(stack.pop())
                 stack.append(char)
         while stack:
-            output += stack.pop()
-        self.postfix = output
+            output.append(stack.pop())
+        self.postfix = output if groups else join_tokens(output)
         return self.postfix
 
 
+def tree_children(node):
+    """Sub-expressions of a postfix_to_tree node"""
+    kind = node[0]
+    if kind in ('sym', 'class'):
+        return ()
+    if kind in ('star', 'repeat'):
+        return node[1:2]
+    return node[1:3]
+
+
+def postfix_to_tree(postfix):
+    """
+    Turn postfix output into a tree of tuples:
+    ('sym', c), ('class', members), ('cat', left, right), ('alt', left, right),
+    ('star', child), ('repeat', child, m, n).
+    """
+    stack = []
+    for char in postfix:
+        if isinstance(char, tuple):
+            if char[0] == 'class':
+                stack.append(char)
+            elif char[0] == 'repeat':
+                stack.append(('repeat', stack.pop(), char[1], char[2]))
+            else:
+                raise ValueError(f"Unknown token in postfix: {char}")
+        elif char == '.':
+            right = stack.pop()
+            stack.append(('cat', stack.pop(), right))
+        elif char == '+':
+            right = stack.pop()
+            stack.append(('alt', stack.pop(), right))
+        elif char == '*':
+            stack.append(('star', stack.pop()))
+        else:
+            stack.append(('sym', char))
+    if len(stack) != 1:
+        raise ValueError("Error: Malformed postfix expression")
+    return stack[0]
+
+
+def tree_to_postfix(tree, reverse=False):
+    """
+    Inverse of postfix_to_tree (iterative, so deep trees are fine).
+    With reverse=True the operands of every concatenation are swapped.
+    """
+    operators = {'cat': '.', 'alt': '+', 'star': '*'}
+    output = []
+    stack = [(tree, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if node[0] == 'sym':
+            output.append(node[1])
+        elif node[0] == 'class':
+            output.append(node)
+        elif expanded:
+            output.append(('repeat', node[2], node[3]) if node[0] == 'repeat' else operators[node[0]])
+        else:
+            stack.append((node, True))
+            children = tree_children(node)
+            if not (reverse and node[0] == 'cat'):
+                children = children[::-1]
+            for child in children:
+                stack.append((child, False))
+    return join_tokens(output)
+
+
+def reverse_postfix(postfix):
+    """Postfix of the reversed regex, which matches exactly the reversed strings"""
+    return tree_to_postfix(postfix_to_tree(postfix), reverse=True)
+
+
 # =======================
 # Example usage
 # =======================
 if __name__ == "__main__":
-    regex = "ed+ee+f(ddd+dd+d)*"
-    parser = RegexParser(regex)
-    try:
-        parser.validate()
-        parser.add_concatenation()
-        postfix = parser.to_postfix()
-        print("Cleaned Regex:", parser.regex)
-        print("Postfix:", postfix)
-    except ValueError as e:
-        print(e)
+    for regex in ["ed+ee+f(ddd+dd+d)*", "ed+ee+fd{1,3}", "[a-c]{2,}(x+y)", "a{3,2}"]:
+        parser = RegexParser(regex)
+        try:
+            parser.validate()
+            parser.add_concatenation()
+            postfix = parser.to_postfix()
+            print("Cleaned Regex:", parser.regex)
+            print("Postfix:", postfix_text(postfix))
+        except ValueError as e:
+            print(e)
@@ -0,0 +1,168 @@
+# modules/searcher.py
+
+from modules.regex_parser import reverse_postfix, postfix_symbols
+from modules.glushkov import GlushkovBuilder
+from modules.dfa_builder import DFABuilder
+from modules.dfa_minimizer import DFAMinimizer
+from modules.compiled_dfa import CompiledDFA, DEAD
+from modules.prefilter import Prefilter, LiteralScanner
+
+
+def compile_postfix(postfix, budget=None):
+    """Run a postfix regex through (ε-free) NFA, DFA and minimization into a CompiledDFA"""
+    nfa = GlushkovBuilder().build_from_postfix(postfix)
+    dfa = DFABuilder(nfa.transitions, nfa.start_state, nfa.final_states).build_dfa(budget)
+    return CompiledDFA.from_dfa(*DFAMinimizer(*dfa).minimize(budget))
+
+
+class Searcher:
+    """
+    Unanchored search with leftmost-longest semantics.
+
+    A reverse DFA for Σ*·reverse(regex) is run once from the end of the text
+    towards the start; wherever it accepts, some match begins. The forward
+    DFA then only runs from those start offsets, to find the longest match,
+    instead of being restarted at every offset.
+
+    When every match starts with one of a few literals, the reverse pass is
+    skipped and candidate offsets come from str.find/bytes.find instead; when
+    every match must contain one of a few literals, texts without any of
+    them are rejected without running a DFA.
+    """
+
+    def __init__(self, postfix, forward=None, budget=None):
+        """
+        Initialize the searcher.
+
+        Parameters:
+        - postfix: postfix regex from RegexParser.to_postfix
+        - forward: CompiledDFA for the regex itself, if already built
+        - budget: optional CompileBudget for each DFA built here
+        """
+        self.postfix = postfix
+        self.forward = forward if forward is not None else compile_postfix(postfix, budget)
+        self.prefilter = Prefilter.from_postfix(postfix)
+
+        any_symbol = ('class', "".join(sorted(postfix_symbols(postfix))))
+        self.reverse = compile_postfix([any_symbol, '*', *reverse_postfix(postfix), '.'], budget)
+
+    @staticmethod
+    def columns(compiled, text):
+        """Column lookup for text: {symbol: column} for str, {byte: column} for bytes"""
+        if isinstance(text, str):
+            return compiled.symbol_map
+        return {b: c for b, c in enumerate(compiled.byte_map) if c != DEAD}
+
+    def match_starts(self, text, pos=0):
+        """
+        Mark every offset of text[pos:] where a match begins.
+        Returns a bytearray with starts[i] == 1 if a match begins at i.
+        """
+        reverse = self.reverse
+        table = reverse.table
+        n_symbols = reverse.n_symbols
+        accepting = reverse.accepting
+        columns = self.columns(reverse, text).get
+        start = reverse.start
+
+        n = len(text)
+        starts = bytearray(n + 1)
+        state = start
+        starts[n] = accepting[state]
+        for i in range(n - 1, pos - 1, -1):
+            column = columns(text[i], DEAD)
+            # A symbol outside the alphabet ends every match; Σ* restarts
+            state = start if column < 0 else table[state * n_symbols + column]
+            starts[i] = accepting[state]
+        return starts
+
+    def longest_at(self, text, i, columns=None):
+        """End of the longest match starting at offset i, or -1 if none"""
+        forward = self.forward
+        table = forward.table
+        n_symbols = forward.n_symbols
+        accepting = forward.accepting
+        if columns is None:
+            columns = self.columns(forward, text)
+        get = columns.get
+
+        state = forward.start
+        last = i if accepting[state] else -1
+        for j in range(i, len(text)):
+            column = get(text[j], DEAD)
+            if column < 0:
+                break
+            state = table[state * n_symbols + column]
+            if state < 0:
+                break
+            if accepting[state]:
+                last = j + 1
+        return last
+
+    def finditer(self, text, pos=0):
+        """
+        Yield (start, end) of successive non-overlapping leftmost-longest
+        matches in text[pos:]. Works on str and on bytes-like input.
+        """
+        columns = self.columns(self.forward, text)
+        searchable = hasattr(text, "find")  # memoryview has no find()
+        if searchable and self.prefilter.prefixes is not None:
+            yield from self.finditer_prefixes(text, pos, columns)
+            return
+        if searchable and not self.prefilter.may_match(text, pos):
+            return
+
+        starts = self.match_starts(text, pos)
+        n = len(text)
+        i = pos
+        while i <= n:
+            i = starts.find(1, i)
+            if i < 0:
+                return
+            end = self.longest_at(text, i, columns)
+            yield i, end
+            i = end if end > i else i + 1
+
+    def finditer_prefixes(self, text, pos, columns):
+        """finditer for patterns whose matches all start with a known literal"""
+        scanner = LiteralScanner(self.prefilter.prefixes, text)
+        i = pos
+        while True:
+            i = scanner.find(i)
+            if i < 0:
+                return
+            end = self.longest_at(text, i, columns)
+            if end > i:
+                yield i, end
+                i = end
+            else:
+                i += 1
+
+    def search(self, text, pos=0):
+        """Return (start, end) of the leftmost-longest match, or None"""
+        for match in self.finditer(text, pos):
+            return match
+        return None
+
+    def count(self, text, pos=0):
+        """Number of non-overlapping matches in text[pos:]"""
+        return sum(1 for _ in self.finditer(text, pos))
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    from modules.regex_parser import RegexParser
+
+    regex = "ed+ee+f(ddd+dd+d)*"
+    parser = RegexParser(regex)
+    parser.validate()
+    parser.add_concatenation()
+    searcher = Searcher(parser.to_postfix())
+
+    text = "xxedyyfddddzzeeq"
+    for start, end in searcher.finditer(text):
+        print(f"Match {text[start:end]!r} at [{start}, {end})")
+    print("Count:", searcher.count(text))
+    print("Bytes search:", searcher.search(text.encode()))
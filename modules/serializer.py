@@ -0,0 +1,116 @@
+# modules/serializer.py
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+
+from modules.compiled_dfa import CompiledDFA
+
+MAGIC = b"TOAD"
+VERSION = 1
+FLAG_BIG_ENDIAN = 1
+
+# magic, version, flags, start, n_states, n_symbols, n_map, payload crc32
+HEADER = struct.Struct("<4sHHiIIII")
+
+
+def dumps(compiled):
+    """
+    Serialize a CompiledDFA to bytes.
+
+    Layout (all integers 32-bit in the writer's byte order):
+    - header: magic, version, flags, start, n_states, n_symbols, n_map, crc32
+    - symbol map: n_map pairs (code point, column)
+    - transition table: n_states * n_symbols entries, -1 for no move
+    - accept map: one byte per state
+    The header is a multiple of 4 bytes, so the table stays aligned.
+    """
+    pairs = array('i')
+    for symbol, column in sorted(compiled.symbol_map.items(), key=lambda item: item[1]):
+        pairs.append(ord(symbol))
+        pairs.append(column)
+    table = array('i', compiled.table)
+    payload = pairs.tobytes() + table.tobytes() + bytes(compiled.accepting)
+
+    flags = FLAG_BIG_ENDIAN if sys.byteorder == "big" else 0
+    header = HEADER.pack(MAGIC, VERSION, flags, compiled.start, compiled.n_states,
+                         compiled.n_symbols, len(compiled.symbol_map), zlib.crc32(payload))
+    return header + payload
+
+
+def save(compiled, path):
+    """Write a CompiledDFA to path"""
+    with open(path, "wb") as f:
+        f.write(dumps(compiled))
+
+
+def loads(buffer, verify=True):
+    """
+    Build a CompiledDFA that matches directly from buffer.
+    The transition table and accept map are memoryviews into the buffer, so
+    nothing but the small symbol map is copied.
+
+    Parameters:
+    - buffer: bytes-like object holding a serialized DFA (bytes, mmap, ...)
+    - verify: check the payload checksum
+
+    Raises:
+    - ValueError if the buffer is not a valid serialized DFA
+    """
+    view = memoryview(buffer).cast('B')
+    if len(view) < HEADER.size:
+        raise ValueError("Error: Truncated automaton file")
+    magic, version, flags, start, n_states, n_symbols, n_map, checksum = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Error: Not a compiled automaton file")
+    if version != VERSION:
+        raise ValueError(f"Error: Unsupported automaton file version {version}")
+    if bool(flags & FLAG_BIG_ENDIAN) != (sys.byteorder == "big"):
+        raise ValueError("Error: Automaton file was written with a different byte order")
+
+    map_start = HEADER.size
+    table_start = map_start + 8 * n_map
+    accept_start = table_start + 4 * n_states * n_symbols
+    if len(view) != accept_start + n_states:
+        raise ValueError("Error: Truncated automaton file")
+    if verify and zlib.crc32(view[map_start:]) != checksum:
+        raise ValueError("Error: Automaton file checksum mismatch")
+
+    pairs = view[map_start:table_start].cast('i')
+    symbol_map = {chr(pairs[k]): pairs[k + 1] for k in range(0, len(pairs), 2)}
+    table = view[table_start:accept_start].cast('i')
+    accepting = view[accept_start:]
+    return CompiledDFA(table, n_symbols, symbol_map, start, accepting)
+
+
+def load(path, verify=True):
+    """
+    Memory-map a serialized DFA and match directly from the mapped pages.
+    Processes loading the same file share those pages.
+    The mmap is kept on the returned object as .buffer.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    compiled = loads(buffer, verify)
+    compiled.buffer = buffer
+    return compiled
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from modules.compiler import compile
+
+    pattern = compile("ed+ee+f(ddd+dd+d)*")
+    path = os.path.join(tempfile.mkdtemp(), "pattern.toad")
+    save(pattern.compiled, path)
+    print("Saved", os.path.getsize(path), "bytes to", path)
+
+    loaded = load(path)
+    for s in ["ed", "fddd", "eef"]:
+        print(f"{s!r}:", "Accepted" if loaded.accepts(s) else "Rejected")
@@ -1,5 +1,70 @@
 # modules/simulator.py
 
+from array import array
+
+from modules.compiled_dfa import CompiledDFA, DEAD
+from modules.stream_matcher import StreamMatcher
+from modules.nfa_simulator import NFASimulator
+
+
+class Trace:
+    """
+    Compact record of a DFA run.
+    Stores the visited state ids in an array('i') instead of one tuple per
+    step; steps are rebuilt as (current_state, symbol, next_state) on access.
+    """
+
+    def __init__(self, compiled, input_string, states, accepted):
+        self.compiled = compiled
+        self.input_string = input_string
+        self.states = states  # states[i] is the state before reading input_string[i]
+        self.accepted = accepted
+
+    def __len__(self):
+        return len(self.states) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("trace index out of range")
+        name = self.compiled.state_name
+        return name(self.states[i]), self.input_string[i], name(self.states[i + 1])
+
+    def __iter__(self):
+        name = self.compiled.state_name
+        states = self.states
+        for i in range(len(self)):
+            yield name(states[i]), self.input_string[i], name(states[i + 1])
+
+    def sample(self, count):
+        """Return about count evenly spaced steps, always including the last one"""
+        if count <= 0:
+            return []
+        total = len(self)
+        if total <= count:
+            return list(self)
+        stride = total / count
+        indices = sorted({int(k * stride) for k in range(count)} | {total - 1})
+        return [self[i] for i in indices]
+
+    def runs(self):
+        """
+        Run-length encode the trace.
+        Yields (state, start, end): the DFA stays in state while reading
+        input_string[start:end].
+        """
+        name = self.compiled.state_name
+        states = self.states
+        start = 0
+        for i in range(1, len(self)):
+            if states[i] != states[start]:
+                yield name(states[start]), start, i
+                start = i
+        if len(self):
+            yield name(states[start]), start, len(self)
+
+
 class Simulator:
     """
     DFA Simulator class.
@@ -18,6 +83,54 @@ class Simulator:
         self.dfa = dfa_transitions
         self.start_state = start_state
         self.final_states = final_states
+        self.compiled = CompiledDFA.from_dfa(dfa_transitions, start_state, final_states)
+
+    @classmethod
+    def from_compiled(cls, compiled):
+        """Simulator over an already packed CompiledDFA (no dict tables needed)"""
+        simulator = cls.__new__(cls)
+        simulator.dfa = None
+        simulator.start_state = compiled.state_name(compiled.start)
+        simulator.final_states = [compiled.state_name(s) for s in range(compiled.n_states)
+                                  if compiled.accepting[s]]
+        simulator.compiled = compiled
+        return simulator
+
+    def accepts(self, input_string):
+        """Return True if the DFA accepts input_string, without recording a trace"""
+        return self.compiled.accepts(input_string)
+
+    def accepts_batch(self, strings):
+        """Vectorized accepts() over many strings (NumPy bool array); see CompiledDFA.accepts_batch"""
+        return self.compiled.accepts_batch(strings)
+
+    def stream(self):
+        """Return a StreamMatcher for feeding input chunk by chunk"""
+        return StreamMatcher(self.compiled)
+
+    def trace(self, input_string):
+        """
+        Run the DFA and record the visited states compactly.
+
+        Returns:
+        - Trace object; iterate it for (current_state, symbol, next_state) steps
+        """
+        compiled = self.compiled
+        table = compiled.table
+        n_symbols = compiled.n_symbols
+        columns = compiled.symbol_map.get
+        state = compiled.start
+        states = array('i', [state])
+
+        for symbol in input_string:
+            column = columns(symbol)
+            state = DEAD if column is None else table[state * n_symbols + column]
+            states.append(state)
+            if state < 0:
+                # Invalid symbol or missing transition
+                return Trace(compiled, input_string, states, False)
+
+        return Trace(compiled, input_string, states, compiled.is_accepting(state))
 
     def simulate(self, input_string):
         """
@@ -30,20 +143,27 @@ class Simulator:
         - transitions_list: list of tuples (current_state, symbol, next_state)
         - accepted: boolean indicating if string is accepted
         """
-        current_state = self.start_state
-        transitions_list = []
+        trace = self.trace(input_string)
+        return list(trace), trace.accepted
 
-        for symbol in input_string:
-            if symbol not in self.dfa[current_state]:
-                # Invalid symbol or missing transition
-                transitions_list.append((current_state, symbol, None))
-                return transitions_list, False
-            next_state = self.dfa[current_state][symbol]
-            transitions_list.append((current_state, symbol, next_state))
-            current_state = next_state
-
-        accepted = current_state in self.final_states
-        return transitions_list, accepted
+
+def create_simulator(transitions, start_state, final_states, engine="dfa"):
+    """
+    Build a simulator for the chosen engine.
+
+    Parameters:
+    - transitions: DFA table for engine "dfa", NFA table for engine "nfa"
+    - start_state: starting state
+    - final_states: list of final states
+    - engine: "dfa" (compiled table) or "nfa" (bit-parallel, no determinization)
+
+    Both simulators provide accepts(input_string) and simulate(input_string).
+    """
+    if engine == "dfa":
+        return Simulator(transitions, start_state, final_states)
+    if engine == "nfa":
+        return NFASimulator(transitions, start_state, final_states)
+    raise ValueError(f"Unknown simulation engine: {engine}")
 
 
 # =======================
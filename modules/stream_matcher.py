@@ -0,0 +1,112 @@
+# modules/stream_matcher.py
+
+from modules.compiled_dfa import DEAD
+
+
+class StreamMatcher:
+    """
+    Resumable matcher over a compiled DFA.
+    Input arrives in chunks through feed(); the current state is carried
+    between chunks, so memory use does not depend on the input length.
+    """
+
+    def __init__(self, compiled):
+        """
+        Initialize the matcher.
+
+        Parameters:
+        - compiled: CompiledDFA to run
+        """
+        self.compiled = compiled
+        self.reset()
+
+    def reset(self):
+        """Start over from the DFA start state"""
+        self.state = self.compiled.start
+        self.consumed = 0
+
+    @property
+    def alive(self):
+        """False once a missing transition has been hit; later input cannot help"""
+        return self.state != DEAD
+
+    def feed(self, chunk):
+        """
+        Consume one chunk of input.
+
+        Parameters:
+        - chunk: str, or a bytes-like object (bytes, bytearray, memoryview, mmap)
+
+        Returns:
+        - True while the input read so far can still be accepted
+        """
+        if self.state == DEAD:
+            return False
+        if isinstance(chunk, str):
+            self.state = self.compiled.run(chunk, self.state)
+            self.consumed += len(chunk)
+        else:
+            self.state = self.compiled.run_bytes(chunk, self.state)
+            with memoryview(chunk) as view:
+                self.consumed += view.nbytes
+        return self.state != DEAD
+
+    def finish(self):
+        """Return True if everything fed so far is accepted"""
+        return self.compiled.is_accepting(self.state)
+
+
+def match_file(compiled, path, chunk_size=1 << 20):
+    """
+    Check whether the whole contents of a file is accepted.
+    The file is read in fixed-size chunks into one reused buffer, and reading
+    stops early as soon as the DFA rejects.
+
+    Parameters:
+    - compiled: CompiledDFA to run
+    - path: file to scan
+    - chunk_size: bytes per read
+
+    Returns:
+    - True if the file is accepted
+    """
+    matcher = StreamMatcher(compiled)
+    buffer = bytearray(chunk_size)
+    with memoryview(buffer) as view, open(path, "rb") as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n:
+                break
+            if not matcher.feed(view[:n]):
+                break
+    return matcher.finish()
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    import mmap
+    import tempfile
+    from modules.compiled_dfa import CompiledDFA
+
+    dfa_transitions = {
+        'q0': {'a': 'q1', 'b': 'q0'},
+        'q1': {'a': 'q1', 'b': 'q2'},
+        'q2': {'a': 'q1', 'b': 'q0'}
+    }
+    compiled = CompiledDFA.from_dfa(dfa_transitions, 'q0', ['q2'])
+
+    matcher = StreamMatcher(compiled)
+    for chunk in ["aa", b"ba", memoryview(b"ab")]:
+        matcher.feed(chunk)
+    print("Stream 'aabaab':", "Accepted" if matcher.finish() else "Rejected")
+
+    with tempfile.NamedTemporaryFile(suffix=".log") as tmp:
+        tmp.write(b"ab" * 100000)
+        tmp.flush()
+        print("File (chunked):", "Accepted" if match_file(compiled, tmp.name, 4096) else "Rejected")
+        with mmap.mmap(tmp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            matcher.reset()
+            matcher.feed(mm)
+            print("File (mmap):", "Accepted" if matcher.finish() else "Rejected")
@@ -0,0 +1,223 @@
+# modules/tagged_dfa.py
+
+from modules.regex_parser import RegexParser
+from modules.nfa_builder import NFABuilder
+
+# Register operation sources (values >= 0 copy that register of the previous state)
+SET_POS = -1  # store the current input position
+SET_NIL = -2  # store -1 (tag not seen)
+
+
+class TaggedDFA:
+    """
+    Tagged DFA in the style of Laurikari: a DFA whose transitions also carry
+    register operations, so capture group positions come out of a single
+    left-to-right pass with no backtracking.
+
+    Every state owns a small array of registers. A transition lists, for each
+    register of its target state, where the new value comes from: the
+    current position, "unset", or a register of the source state.
+    """
+
+    def __init__(self, transitions, start, initial_ops, finals, n_groups):
+        """
+        Parameters:
+        - transitions: list indexed by state of {symbol: (next_state, ops)};
+          ops is a tuple of register sources, or None when registers are kept as they are
+        - start: start state
+        - initial_ops: register sources of the start state, applied at position 0
+        - finals: list indexed by state of None (not accepting) or the tuple
+          of registers holding each tag when the input ends there
+        - n_groups: number of capture groups
+        """
+        self.transitions = transitions
+        self.start = start
+        self.initial_ops = initial_ops
+        self.finals = finals
+        self.n_groups = n_groups
+
+    @staticmethod
+    def apply(ops, registers, position):
+        return [position if source == SET_POS else -1 if source == SET_NIL else registers[source]
+                for source in ops]
+
+    def match(self, input_string):
+        """
+        Match the whole input string.
+
+        Returns:
+        - None if the string is rejected, otherwise a list of spans: index 0
+          is the whole string, index k is (start, end) of group k or None if
+          the group did not take part in the match
+        """
+        apply = self.apply
+        transitions = self.transitions
+        state = self.start
+        registers = apply(self.initial_ops, (), 0)
+        for i, symbol in enumerate(input_string):
+            edge = transitions[state].get(symbol)
+            if edge is None:
+                return None
+            state, ops = edge
+            if ops is not None:
+                registers = apply(ops, registers, i + 1)
+        final = self.finals[state]
+        if final is None:
+            return None
+        values = [registers[r] for r in final]
+        spans = [(0, len(input_string))]
+        for k in range(self.n_groups):
+            start, end = values[2 * k], values[2 * k + 1]
+            spans.append((start, end) if start >= 0 and end >= 0 else None)
+        return spans
+
+    def groups(self, input_string):
+        """Same as match(), but returns the captured substrings (None for unset groups)"""
+        spans = self.match(input_string)
+        if spans is None:
+            return None
+        return [input_string[span[0]:span[1]] if span is not None else None for span in spans]
+
+
+class TaggedDFABuilder:
+    """
+    Subset construction over a tagged NFA (see NFABuilder.group).
+
+    A DFA state is an ordered list of configurations (NFA state, register
+    of every tag), highest priority first. Configurations are advanced like
+    threads of a Pike VM: ε-edges are followed depth first in their listed
+    order, and only the first configuration to reach an NFA state survives.
+    This gives the same leftmost-greedy submatches as a backtracking matcher
+    (alternatives tried left to right, stars greedy), without backtracking.
+    One difference from Python's re: a starred group that can match the
+    empty string gets no extra empty last iteration (RE2 behaves the same).
+
+    Registers are renumbered in order of first use in each state, so states
+    that differ only in register names are the same DFA state; the
+    renumbering becomes the register operations of the transition.
+    """
+
+    def __init__(self, nfa_transitions, nfa_start, nfa_final, tags, n_groups):
+        """
+        Parameters:
+        - nfa_transitions: dict {state: {symbol: [next_states]}}, ε lists in priority order
+        - nfa_start: start state of NFA
+        - nfa_final: final state of NFA
+        - tags: dict {state: tag}; tag 2k-2 opens group k and tag 2k-1 closes it
+        - n_groups: number of capture groups
+        """
+        states = list(nfa_transitions)
+        index = {name: i for i, name in enumerate(states)}
+        self.epsilon = [[index[d] for d in nfa_transitions[name].get('ε', [])] for name in states]
+        self.moves = [{symbol: [index[d] for d in dests] for symbol, dests in nfa_transitions[name].items()
+                       if symbol != 'ε'} for name in states]
+        self.tag_of = [tags.get(name, -1) for name in states]
+        self.start = index[nfa_start]
+        self.final = index[nfa_final]
+        self.n_groups = n_groups
+        self.n_tags = 2 * n_groups
+        self.symbols = sorted({symbol for moves in self.moves for symbol in moves})
+
+    def closure(self, seeds):
+        """
+        Follow ε-edges from seed configurations in priority order.
+        Tags passed on the way are set to the current position (SET_POS).
+        Only configurations that can read a symbol or accept are kept.
+        """
+        moves = self.moves
+        epsilon = self.epsilon
+        tag_of = self.tag_of
+        visited = set()
+        result = []
+        for seed in seeds:
+            stack = [seed]
+            while stack:
+                q, registers = stack.pop()
+                if q in visited:
+                    continue
+                visited.add(q)
+                tag = tag_of[q]
+                if tag >= 0:
+                    registers = registers[:tag] + (SET_POS,) + registers[tag + 1:]
+                if moves[q] or q == self.final:
+                    result.append((q, registers))
+                for target in reversed(epsilon[q]):
+                    stack.append((target, registers))
+        return result
+
+    def canonical(self, configurations):
+        """
+        Renumber registers in order of first use.
+        Returns (state key, register sources, final registers or None).
+        """
+        numbering = {}
+        key = []
+        final = None
+        for q, registers in configurations:
+            renamed = tuple(numbering.setdefault(source, len(numbering)) for source in registers)
+            key.append((q, renamed))
+            if final is None and q == self.final:
+                final = renamed
+        ops = tuple(numbering)  # dict order: register i of the new state comes from ops[i]
+        return tuple(key), ops, final
+
+    def build(self, budget=None):
+        """
+        Build the whole tagged DFA.
+
+        Parameters:
+        - budget: optional CompileBudget (BudgetExceeded when it runs out)
+        """
+        meter = budget.start() if budget is not None else None
+        initial = self.closure([(self.start, (SET_NIL,) * self.n_tags)])
+        key, initial_ops, final = self.canonical(initial)
+        state_ids = {key: 0}
+        transitions = [{}]
+        finals = [final]
+        unmarked = [key]
+        nbytes = 0
+        while unmarked:
+            key = unmarked.pop()
+            paths = transitions[state_ids[key]]
+            for symbol in self.symbols:
+                seeds = [(target, registers) for q, registers in key
+                         for target in self.moves[q].get(symbol, ())]
+                if not seeds:
+                    continue
+                target_key, ops, final = self.canonical(self.closure(seeds))
+                target = state_ids.get(target_key)
+                if target is None:
+                    if meter is not None:
+                        nbytes += 64 * (1 + self.n_tags) * len(target_key)
+                        meter.check("tagged subset construction", len(state_ids) + 1, nbytes)
+                    target = len(state_ids)
+                    state_ids[target_key] = target
+                    transitions.append({})
+                    finals.append(final)
+                    unmarked.append(target_key)
+                if ops == tuple(range(len(ops))):
+                    ops = None  # the registers the target uses keep their values
+                paths[symbol] = (target, ops)
+        return TaggedDFA(transitions, 0, initial_ops, finals, self.n_groups)
+
+
+def compile_groups(regex, budget=None):
+    """Parse regex keeping its groups and build its TaggedDFA"""
+    parser = RegexParser(regex)
+    parser.validate()
+    parser.add_concatenation()
+    tokens = parser.to_postfix(groups=True)
+    nfa = NFABuilder().build_from_postfix(tokens)
+    builder = TaggedDFABuilder(nfa.transitions, nfa.start_state, nfa.final_state, nfa.tags, parser.groups)
+    return builder.build(budget)
+
+
+# =======================
+# Example usage
+# =======================
+if __name__ == "__main__":
+    regex = "(a+b)*(ab)c"
+    tdfa = compile_groups(regex)
+    print("Tagged DFA states:", len(tdfa.transitions))
+    for s in ["abababc", "abc", "abd"]:
+        print(f"{s!r}: spans={tdfa.match(s)} groups={tdfa.groups(s)}")
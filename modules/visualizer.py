@@ -20,11 +20,16 @@ class Visualizer:
         self.final_states = final_states
         self.title = title
 
-    def draw(self):
+    def draw(self, block=True):
         """
         Draw the automaton graph using matplotlib and networkx.
         Applies HCI-friendly layout and styling.
+
+        Parameters:
+        - block: wait until the window is closed; with block=False the figure
+          stays open beside a running Qt event loop
         """
+        plt.figure()
         G = nx.DiGraph()
 
         # Add edges
@@ -85,7 +90,7 @@ class Visualizer:
         plt.title(self.title, fontsize=16, fontweight="bold")
         plt.axis("off")
         plt.tight_layout()
-        plt.show()
+        plt.show(block=block)
 
 
 # =======================